@@ -1 +1,3 @@
+from .draft_session import *
+from .explanation import *
 from .god_picker import *
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+from data import SNAPSHOT_ERRORS, GodData, load_data
+
+from .god_picker import CounterCheck, GodPicker
+
+# Each worker loads the counter file once and every player data file at most
+# once, then reuses them for all the scenarios it's handed. A GodPicker
+# rebuilds its matchup matrix and drops its cache whenever it's given other
+# data, so every data file gets a picker of its own, all sharing the one
+# CounterCheck.
+batch_counters_file = "files/god_counters.txt"
+batch_counter_checker: CounterCheck | None = None
+batch_data: dict[str, dict[str, GodData]] = {}
+batch_pickers: dict[str, GodPicker] = {}
+
+
+def init_batch_worker(counters_file: str) -> None:
+    global batch_counters_file, batch_counter_checker
+    batch_counters_file = counters_file
+    batch_counter_checker = CounterCheck(counters_file)
+    batch_data.clear()
+    batch_pickers.clear()
+
+
+def load_player_data(filepath: str) -> dict[str, GodData]:
+    if filepath not in batch_data:
+        batch_data[filepath], _ = load_data(filepath)
+    return batch_data[filepath]
+
+
+def get_batch_picker(filepath: str) -> GodPicker:
+    if filepath not in batch_pickers:
+        batch_pickers[filepath] = GodPicker(
+            batch_counters_file, batch_counter_checker
+        )
+    return batch_pickers[filepath]
+
+
+def scenario_gods(scenario: dict, key: str) -> set[str]:
+    gods = scenario.get(key) or []
+    if not isinstance(gods, list) or not all(isinstance(god, str) for god in gods):
+        raise ValueError(f"{key} must be a list of god names")
+    return set(gods)
+
+
+def evaluate_scenario(scenario: dict) -> dict:
+    # A bad scenario or data file gets an error entry instead of stopping the
+    # whole run
+    result = {"scenario": scenario}
+    try:
+        if not isinstance(scenario, dict):
+            raise ValueError("a scenario must be a JSON object")
+        picks = scenario_gods(scenario, "picks")
+        bans = scenario_gods(scenario, "bans")
+        data = load_player_data(scenario["data_file"])
+        messages = []
+        result["best_gods"] = get_batch_picker(scenario["data_file"]).get_best_gods(
+            data,
+            picks,
+            bans,
+            messages,
+            amount=int(scenario.get("amount", 1)),
+        )
+        result["messages"] = [
+            [str(message), message.message_type] for message in messages
+        ]
+    except (OSError, *SNAPSHOT_ERRORS, KeyError, TypeError, ValueError) as e:
+        result["error"] = repr(e)
+    return result
+
+
+def read_scenarios(filepath: str) -> Iterator[dict]:
+    with open(filepath) as scenarios_file:
+        for line in scenarios_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def evaluate_scenarios(
+    scenarios_file: str,
+    results_file: str,
+    counters_file: str = "files/god_counters.txt",
+    workers: int | None = None,
+    chunk_size: int = 64,
+) -> int:
+    count = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_batch_worker,
+        initargs=(counters_file,),
+    ) as pool, open(results_file, "w") as results:
+        for result in pool.map(
+            evaluate_scenario, read_scenarios(scenarios_file), chunksize=chunk_size
+        ):
+            results.write(json.dumps(result) + "\n")
+            count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run get_best_gods for every draft scenario in a JSONL file"
+    )
+    parser.add_argument(
+        "scenarios",
+        help='JSONL file with one {"picks", "bans", "data_file", "amount"} per line',
+    )
+    parser.add_argument("results", help="JSONL file to write the results to")
+    parser.add_argument("--counters", default="files/god_counters.txt")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    count = evaluate_scenarios(
+        args.scenarios, args.results, args.counters, args.workers, args.chunk_size
+    )
+    print(f"Evaluated {count} scenarios")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import os
+
+COUNTER_GRAPH_VERSION = 1
+
+# Misspellings in the counter file that normalizing alone doesn't fix
+COUNTER_ALIASES = {
+    "Awi": "Awilix",
+    "Cthuldu": "Cthulhu",
+    "Zerus": "Zeus",
+}
+
+
+def counter_graph_path(counters_file: str) -> str:
+    return os.path.splitext(counters_file)[0] + ".json"
+
+
+def file_hash(*filepaths: str) -> str:
+    digest = hashlib.sha256()
+    for filepath in filepaths:
+        try:
+            with open(filepath, "rb") as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_stats(*filepaths: str) -> list:
+    stats = []
+    for filepath in filepaths:
+        try:
+            stat = os.stat(filepath)
+            stats.append([stat.st_mtime_ns, stat.st_size])
+        except FileNotFoundError:
+            stats.append(None)
+    return stats
+
+
+class NameResolver:
+    # Maps the names used in the counter file onto the names in the god list,
+    # ignoring case and stray spaces and resolving known misspellings
+    def __init__(self, god_names: list[str]):
+        self.canonical = {name.casefold(): name for name in god_names}
+
+    def resolve(self, name: str) -> str | None:
+        name = " ".join(name.split())
+        name = COUNTER_ALIASES.get(name, name)
+        return self.canonical.get(name.casefold())
+
+
+def compile_counter_graph(counters_file: str, gods_file: str) -> dict:
+    # The counter file has one line per god, the god followed by the gods
+    # that counter it. The compiled graph stores every name once, gods from
+    # the god list first, and the counters as ids into that list.
+    try:
+        with open(gods_file) as f:
+            god_names = [god.strip() for god in f if god.strip()]
+    except FileNotFoundError:
+        god_names = []
+    resolver = NameResolver(god_names)
+
+    names = list(god_names)
+    ids = {name: i for i, name in enumerate(names)}
+    unknown = []
+
+    def name_id(name: str) -> int:
+        resolved = resolver.resolve(name)
+        if resolved is None:
+            # Keep names that aren't gods, so nothing is lost, but report them
+            resolved = " ".join(name.split())
+            if resolved not in unknown:
+                unknown.append(resolved)
+        if resolved not in ids:
+            ids[resolved] = len(names)
+            names.append(resolved)
+        return ids[resolved]
+
+    counters = {}
+    with open(counters_file) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            god, *god_counters = line.split(",")
+            counters[name_id(god)] = [name_id(counter) for counter in god_counters]
+
+    return {
+        "version": COUNTER_GRAPH_VERSION,
+        "source_hash": file_hash(counters_file, gods_file),
+        "source_stats": file_stats(counters_file, gods_file),
+        "names": names,
+        "counters": [[god, god_counters] for god, god_counters in counters.items()],
+        "unknown": unknown,
+    }
+
+
+def write_counter_graph(graph: dict, filepath: str) -> None:
+    temp_filepath = filepath + ".tmp"
+    with open(temp_filepath, "w") as f:
+        json.dump(graph, f)
+    os.replace(temp_filepath, filepath)
+
+
+def read_counter_graph(filepath: str) -> dict | None:
+    try:
+        with open(filepath) as f:
+            graph = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if graph.get("version") != COUNTER_GRAPH_VERSION:
+        return None
+    return graph
+
+
+def load_counter_graph(
+    counters_file: str, gods_file: str = "files/all_gods.txt"
+) -> tuple[dict, bool]:
+    # The compiled graph next to the counter file, rebuilt when the counter
+    # file or god list changed. Unchanged files are recognized by their stats
+    # first and their hash second, so a touched file doesn't mean a rebuild.
+    # Also returns whether it was rebuilt.
+    graph_file = counter_graph_path(counters_file)
+    graph = read_counter_graph(graph_file)
+    if graph is not None:
+        stats = file_stats(counters_file, gods_file)
+        if graph["source_stats"] == stats:
+            return graph, False
+        if graph["source_hash"] == file_hash(counters_file, gods_file):
+            graph["source_stats"] = stats
+            try:
+                write_counter_graph(graph, graph_file)
+            except OSError:
+                pass
+            return graph, False
+
+    graph = compile_counter_graph(counters_file, gods_file)
+    try:
+        write_counter_graph(graph, graph_file)
+    except OSError:
+        pass
+    return graph, True
+
+
+def counters_by_name(graph: dict) -> dict[str, list[str]]:
+    names = graph["names"]
+    return {
+        names[god]: [names[counter] for counter in god_counters]
+        for god, god_counters in graph["counters"]
+    }
+
+
+def unknown_names_message(counters_file: str, unknown: list[str]) -> str:
+    shown = ", ".join(unknown[:10])
+    if len(unknown) > 10:
+        shown += f" and {len(unknown) - 10} more"
+    return f"Unknown gods in {counters_file}: {shown}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compile the counter file into a validated counter graph"
+    )
+    parser.add_argument("counters", nargs="?", default="files/god_counters.txt")
+    parser.add_argument("--gods", default="files/all_gods.txt")
+    args = parser.parse_args()
+
+    graph = compile_counter_graph(args.counters, args.gods)
+    write_counter_graph(graph, counter_graph_path(args.counters))
+    print(
+        f"Compiled {len(graph['counters'])} gods to "
+        f"{counter_graph_path(args.counters)}"
+    )
+    if graph["unknown"]:
+        print(unknown_names_message(args.counters, graph["unknown"]))
+
+
+if __name__ == "__main__":
+    main()
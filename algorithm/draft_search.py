@@ -0,0 +1,96 @@
+import time
+
+import numpy as np
+
+from .matchup_matrix import MatchupMatrix
+
+ENEMY_TEAM_SIZE = 5
+
+# Set in every worker by init_search_worker, so the matrix is only sent to
+# each process once instead of with every chunk of gods
+search_matrix: MatchupMatrix | None = None
+
+
+def init_search_worker(matchup_matrix: MatchupMatrix) -> None:
+    global search_matrix
+    search_matrix = matchup_matrix
+
+
+def score_god(matchup_matrix: MatchupMatrix, god: int, picks: np.ndarray) -> float:
+    rows = np.array([god])
+    countered = matchup_matrix.counters[picks, god].sum(keepdims=True)
+    counter_values = matchup_matrix.counter_penalties(
+        rows, picks
+    ) + matchup_matrix.counter_bonuses(rows, countered)
+    return float(matchup_matrix.combine(counter_values, rows)[0])
+
+
+def lookahead_value(
+    matchup_matrix: MatchupMatrix,
+    god: int,
+    picks: tuple[int, ...],
+    excluded: set[int],
+    depth: int,
+    beam_width: int,
+    bound: float,
+) -> tuple[float, bool]:
+    # The enemy fills its remaining slots to hurt god as much as possible.
+    # Only gods that counter god lower its score, so those are the only
+    # picks worth searching. Every extra counter lowers the score further,
+    # so once the worst score found drops below bound god can't make the
+    # cut and the search stops early.
+    options = [
+        counter
+        for counter in np.flatnonzero(matchup_matrix.counters[god])
+        if counter != god and counter not in excluded and counter not in picks
+    ]
+
+    worst = score_god(matchup_matrix, god, np.array(picks, dtype=np.int64))
+    beam = [picks]
+    for _ in range(depth):
+        expansions = {}
+        for enemy_picks in beam:
+            for counter in options:
+                if counter in enemy_picks:
+                    continue
+                expanded = tuple(sorted(enemy_picks + (counter,)))
+                if expanded not in expansions:
+                    expansions[expanded] = score_god(
+                        matchup_matrix, god, np.array(expanded, dtype=np.int64)
+                    )
+        if not expansions:
+            break
+
+        beam = sorted(expansions, key=expansions.get)[:beam_width]
+        worst = min(worst, expansions[beam[0]])
+        if worst < bound:
+            return worst, False
+
+    return worst, True
+
+
+def search_gods(
+    gods: list[int],
+    picks: tuple[int, ...],
+    excluded: set[int],
+    depth: int,
+    beam_width: int,
+    amount: int,
+    deadline: float,
+) -> list[tuple[int, float, bool]]:
+    results = []
+    best_values = []
+    for god in gods:
+        if time.time() >= deadline:
+            break
+
+        bound = best_values[amount - 1] if len(best_values) >= amount else -np.inf
+        value, complete = lookahead_value(
+            search_matrix, god, picks, excluded, depth, beam_width, bound
+        )
+        results.append((god, value, complete))
+        if complete:
+            best_values.append(value)
+            best_values.sort(reverse=True)
+
+    return results
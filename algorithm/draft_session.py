@@ -0,0 +1,110 @@
+from collections.abc import Iterator
+from itertools import islice
+
+import numpy as np
+
+from .explanation import Explanation
+from .matchup_matrix import MatchupMatrix
+
+
+class DraftSession:
+    def __init__(self, matchup_matrix: MatchupMatrix):
+        self.matchup_matrix = matchup_matrix
+        self.gods_picked: set[str] = set()
+        self.gods_banned: set[str] = set()
+
+        # Enemy picks that count towards the score, i.e. picked and not banned
+        self.active: set[int] = set()
+        self.penalties = np.zeros(matchup_matrix.candidate_count)
+        self.countered = np.zeros(matchup_matrix.candidate_count, dtype=np.int64)
+        self.bonuses = np.zeros(matchup_matrix.candidate_count)
+
+    def add_pick(self, god_name: str) -> None:
+        if god_name in self.gods_picked:
+            return
+        self.gods_picked.add(god_name)
+        if god_name not in self.gods_banned:
+            self.activate(god_name)
+
+    def remove_pick(self, god_name: str) -> None:
+        if god_name not in self.gods_picked:
+            return
+        self.gods_picked.remove(god_name)
+        if god_name not in self.gods_banned:
+            self.deactivate(god_name)
+
+    def add_ban(self, god_name: str) -> None:
+        if god_name in self.gods_banned:
+            return
+        self.gods_banned.add(god_name)
+        if god_name in self.gods_picked:
+            self.deactivate(god_name)
+
+    def remove_ban(self, god_name: str) -> None:
+        if god_name not in self.gods_banned:
+            return
+        self.gods_banned.remove(god_name)
+        if god_name in self.gods_picked:
+            self.activate(god_name)
+
+    def update(self, gods_picked: set[str], gods_banned: set[str]) -> None:
+        for god_name in self.gods_banned - gods_banned:
+            self.remove_ban(god_name)
+        for god_name in self.gods_picked - gods_picked:
+            self.remove_pick(god_name)
+        for god_name in gods_banned - self.gods_banned:
+            self.add_ban(god_name)
+        for god_name in gods_picked - self.gods_picked:
+            self.add_pick(god_name)
+
+    def activate(self, god_name: str) -> None:
+        if god_name not in self.matchup_matrix.index:
+            return
+        god = self.matchup_matrix.index[god_name]
+        self.active.add(god)
+        self.rescore(god, 1)
+
+    def deactivate(self, god_name: str) -> None:
+        if god_name not in self.matchup_matrix.index:
+            return
+        god = self.matchup_matrix.index[god_name]
+        self.active.remove(god)
+        self.rescore(god, -1)
+
+    def rescore(self, god: int, change: int) -> None:
+        # Only the gods god counters have a penalty that depends on it, and
+        # only the gods that counter god get a bonus from it
+        picks = np.array(sorted(self.active), dtype=np.int64)
+        rows = self.matchup_matrix.countered_by[god]
+        if rows.size:
+            self.penalties[rows] = self.matchup_matrix.counter_penalties(rows, picks)
+
+        rows = self.matchup_matrix.counters_of[god]
+        if rows.size:
+            self.countered[rows] += change
+            self.bonuses[rows] = self.matchup_matrix.counter_bonuses(
+                rows, self.countered[rows]
+            )
+
+    @property
+    def scores(self) -> np.ndarray:
+        if not self.gods_picked:
+            return self.matchup_matrix.values
+        return self.matchup_matrix.combine(self.penalties + self.bonuses)
+
+    def iter_best_gods(self, batch_size: int = 8) -> Iterator[str]:
+        return self.matchup_matrix.iter_scores_ranked(
+            self.scores, self.gods_banned | self.gods_picked, batch_size
+        )
+
+    def get_best_gods(self, amount: int = 1) -> list[str]:
+        if amount <= 0:
+            return []
+        return list(islice(self.iter_best_gods(amount), amount))
+
+    def explanations(self, gods: list[str] | None = None) -> list[Explanation]:
+        if not self.gods_picked:
+            return []
+        return self.matchup_matrix.explanations(
+            self.gods_picked, self.gods_banned, gods
+        )
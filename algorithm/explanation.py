@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+
+# How much get_best_gods explains its picks
+QUIET = 0  # Nothing
+WARNINGS = 1  # Only matchups you've never played, for the gods returned
+NORMAL = 2  # Every matchup of the gods returned
+VERBOSE = 3  # Every matchup of every god considered
+
+
+@dataclass(frozen=True)
+class Explanation:
+    god_name: str
+    enemy_god: str
+    you_counter: bool
+    rate: float | None = None
+
+    @property
+    def message_type(self) -> str:
+        return "warning" if self.rate is None else "normal"
+
+    def __str__(self) -> str:
+        if self.you_counter:
+            if self.rate is None:
+                return f"You have never played as {self.god_name} against {self.enemy_god}, who they counter"
+            return f"Your win rate as {self.god_name} against {self.enemy_god} is {self.rate}"
+
+        if self.rate is None:
+            return f"You have never played as {self.god_name} against the counter {self.enemy_god}"
+        return f"Your lose rate as {self.god_name} against {self.enemy_god} is {self.rate}"
@@ -1,31 +1,97 @@
-from collections import defaultdict
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, wait
 
-from data import GodData
+from data import GodData, RecencyStats
+
+from .counter_graph import (
+    counters_by_name,
+    load_counter_graph,
+    unknown_names_message,
+)
+from .draft_search import ENEMY_TEAM_SIZE, init_search_worker, search_gods
+from .draft_session import DraftSession
+from .explanation import NORMAL, QUIET, VERBOSE, WARNINGS
+from .matchup_matrix import MatchupMatrix
+from .recommendation_cache import RecommendationCache
 
 
 class CounterCheck:
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, gods_file: str = "files/all_gods.txt"):
         self.file = filename
-        self.counters = defaultdict(list)
+        self.gods_file = gods_file
+        # counters[god] lists the gods that counter god, in file order
+        self.counters: dict[str, list[str]] = {}
+        self.unknown: list[str] = []
         self.read_data()
 
     def read_data(self) -> None:
+        # Names are resolved against the god list when the counter file is
+        # compiled, which only happens again once it changes
         try:
-            with open(self.file, "r") as f:
-                content = f.read()
-            for line in content.split("\n"):
-                gods = line.split(",")
-                self.counters[gods[0]] = gods[1:]
+            graph, rebuilt = load_counter_graph(self.file, self.gods_file)
         except FileNotFoundError:
             print("no such file")
+            return
+
+        self.unknown = graph["unknown"]
+        if rebuilt and self.unknown:
+            print(unknown_names_message(self.file, self.unknown))
 
-    def get_counters(self, god_name: str):
-        return self.counters[god_name]
+        self.counters = counters_by_name(graph)
+
+    def get_counters(self, god_name: str) -> list[str]:
+        return self.counters.get(god_name, [])
 
 
 class GodPicker:
-    def __init__(self, filename: str):
-        self.counter_checker = CounterCheck(filename)
+    def __init__(self, filename: str, counter_checker: CounterCheck | None = None):
+        # Pickers of the same counter file can share one CounterCheck
+        self.counter_checker = counter_checker or CounterCheck(filename)
+        self.matchup_matrix = None
+        self.matchup_matrix_key = None
+        self.draft_session = None
+        self.recommendation_cache = RecommendationCache()
+        self.data_version = 0
+        self.search_pool = None
+        self.search_pool_version = None
+
+    def get_data_version(self, data: dict[str, GodData]) -> int:
+        # get_player_data publishes a freshly loaded dict, and every scraped
+        # match bumps a total, so either tells us the data has changed. The
+        # matrix keeps a reference to data so its id can't be reused.
+        key = (
+            len(data),
+            sum(god.total_wins + god.total_losses for god in data.values()),
+        )
+        if self.matchup_matrix is None or (
+            self.matchup_matrix.data is not data or key != self.matchup_matrix_key
+        ):
+            self.matchup_matrix = MatchupMatrix(data, self.counter_checker.counters)
+            self.matchup_matrix_key = key
+            self.data_version += 1
+            self.recommendation_cache.clear()
+        return self.data_version
+
+    def get_matchup_matrix(self, data: dict[str, GodData]) -> MatchupMatrix:
+        self.get_data_version(data)
+        return self.matchup_matrix
+
+    def get_draft_session(self, data: dict[str, GodData]) -> DraftSession:
+        # A new matrix means new data, so replay the draft onto a new session
+        matchup_matrix = self.get_matchup_matrix(data)
+        previous_session = self.draft_session
+        if (
+            previous_session is None
+            or previous_session.matchup_matrix is not matchup_matrix
+        ):
+            self.draft_session = DraftSession(matchup_matrix)
+            if previous_session is not None:
+                self.draft_session.update(
+                    previous_session.gods_picked, previous_session.gods_banned
+                )
+        return self.draft_session
 
     def get_best_gods(
         self,
@@ -34,98 +100,50 @@ class GodPicker:
         gods_banned: set[str],
         console_messages,
         amount: int = 1,
+        verbosity: int = NORMAL,
+        recency: RecencyStats | None = None,
+        window_days: float | None = None,
     ) -> list[str]:
-        if not gods_picked:
-            return [
-                tup[0]
-                for tup in sorted(
-                    data.items(), key=lambda tup: tup[1].value, reverse=True
-                )
-                if tup[0] not in gods_banned
-            ][:amount]
-
-        god_ratings: list[tuple[str, int]] = []
-        for god_name, god_data in data.items():
-            if god_name in gods_banned | gods_picked:
-                continue
-
-            value = 0
-            num_counters_you = 0
-            num_you_counter = 0
-
-            # Check counters
-            for counter in self.counter_checker.get_counters(god_name):
-                if counter in gods_banned:
-                    continue
-                if counter in gods_picked:
-                    num_counters_you += 1
-                    if (
-                        data[god_name].matchups[counter][0]
-                        + data[god_name].matchups[counter][1]
-                        == 0
-                    ):
-                        lose_rate_against = 0.5
-                        console_messages.append(
-                            (
-                                f"You have never played as {god_name} against the counter {counter}",
-                                "warning",
-                            )
-                        )
-                    else:
-                        lose_rate_against = data[god_name].matchups[counter][1] / (
-                            data[god_name].matchups[counter][0]
-                            + data[god_name].matchups[counter][1]
-                        )
-                        console_messages.append(
-                            (
-                                f"Your lose rate as {god_name} against {counter} is {lose_rate_against}",
-                                "normal",
-                            )
-                        )
-
-                    value -= 5 * num_counters_you * lose_rate_against
-
-            # Check if you counter
-            for enemy_god in gods_picked:
-                if enemy_god in gods_banned:
-                    continue
-                for counter in self.counter_checker.get_counters(enemy_god):
-                    if counter == god_name:
-                        if (
-                            data[god_name].matchups[counter][0]
-                            + data[god_name].matchups[counter][1]
-                            == 0
-                        ):
-                            win_rate_against = 0.5
-                            console_messages.append(
-                                (
-                                    f"You have never played as {god_name} against {enemy_god}, who they counter",
-                                    "warning",
-                                )
-                            )
-                        else:
-                            win_rate_against = data[god_name].matchups[counter][0] / (
-                                data[god_name].matchups[counter][0]
-                                + data[god_name].matchups[counter][1]
-                            )
-                            console_messages.append(
-                                (
-                                    f"Your win rate as {god_name} against {enemy_god} is {win_rate_against}",
-                                    "normal",
-                                )
-                            )
-                        num_you_counter += 1
-                        value += 5 * num_you_counter * win_rate_against
-                        break
-
-            # Add your skill with the character
-            # Should only count for 1/3 of the toal value
-
-            value = value / 3 * 2 + god_data.value / 3
-            god_ratings.append((god_name, value))
-
-        god_ratings.sort(key=lambda god: god[1], reverse=True)
-        return [god[0] for god in god_ratings][:amount]
+        # console_messages gets Explanation records, which are only turned
+        # into text when the console displays them. With recency the gods are
+        # picked from decay weighted stats instead, or only the matches of
+        # the last window_days.
+        if recency is not None:
+            data = recency.weighted_data(data, window_days)
+
+        key = (
+            frozenset(gods_picked),
+            frozenset(gods_banned),
+            amount,
+            verbosity,
+            self.get_data_version(data),
+        )
+        cached = self.recommendation_cache.get(key)
+        if cached is not None:
+            best_gods, explanations = cached
+            console_messages.extend(explanations)
+            return list(best_gods)
+
+        draft_session = self.get_draft_session(data)
+        draft_session.update(gods_picked, gods_banned)
+        best_gods = draft_session.get_best_gods(amount)
+
+        if verbosity == QUIET:
+            explanations = []
+        elif verbosity == VERBOSE:
+            explanations = draft_session.explanations()
+        else:
+            explanations = draft_session.explanations(best_gods)
+            if verbosity == WARNINGS:
+                explanations = [
+                    explanation
+                    for explanation in explanations
+                    if explanation.rate is None
+                ]
+        self.recommendation_cache.put(key, (tuple(best_gods), explanations))
+
+        console_messages.extend(explanations)
+        return best_gods
 
         """
         decrease_value = 4.5
@@ -168,3 +186,95 @@ class GodPicker:
 
             gods.append((god, value))
         """
+
+    def iter_best_gods(
+        self,
+        data: dict[str, GodData],
+        gods_picked: set[str],
+        gods_banned: set[str],
+        batch_size: int = 8,
+    ) -> Iterator[str]:
+        return self.get_matchup_matrix(data).iter_ranked(
+            gods_picked, gods_banned, batch_size
+        )
+
+    def get_search_pool(self, data: dict[str, GodData]) -> ProcessPoolExecutor:
+        data_version = self.get_data_version(data)
+        if self.search_pool is None or self.search_pool_version != data_version:
+            if self.search_pool is not None:
+                self.search_pool.shutdown(wait=False, cancel_futures=True)
+            self.search_pool = ProcessPoolExecutor(
+                initializer=init_search_worker, initargs=(self.matchup_matrix,)
+            )
+            self.search_pool_version = data_version
+        return self.search_pool
+
+    def search_best_gods(
+        self,
+        data: dict[str, GodData],
+        gods_picked: set[str],
+        gods_banned: set[str],
+        amount: int = 1,
+        depth: int = 2,
+        beam_width: int = 4,
+        time_budget: float = 1.0,
+    ) -> list[str]:
+        deadline = time.time() + time_budget
+        matchup_matrix = self.get_matchup_matrix(data)
+        picks = tuple(
+            int(god) for god in matchup_matrix.active_picks(gods_picked, gods_banned)
+        )
+        depth = min(depth, ENEMY_TEAM_SIZE - len(picks))
+
+        excluded_names = gods_banned | gods_picked
+        ranked = list(
+            matchup_matrix.iter_scores_ranked(
+                matchup_matrix.score(gods_picked, gods_banned),
+                excluded_names,
+                batch_size=matchup_matrix.candidate_count,
+            )
+        )
+        if depth <= 0 or amount <= 0:
+            return ranked[:amount]
+
+        # Deal the gods out round robin so every chunk starts with some of
+        # the best ones and the bound used for pruning tightens quickly
+        excluded = {
+            matchup_matrix.index[god]
+            for god in excluded_names
+            if god in matchup_matrix.index
+        }
+        gods = [matchup_matrix.index[god] for god in ranked]
+        chunk_count = min(len(gods), 4 * (os.cpu_count() or 1))
+        search_pool = self.get_search_pool(data)
+        futures = [
+            search_pool.submit(
+                search_gods,
+                gods[i::chunk_count],
+                picks,
+                excluded,
+                depth,
+                beam_width,
+                amount,
+                deadline,
+            )
+            for i in range(chunk_count)
+        ]
+        done, not_done = wait(futures, timeout=max(0, deadline - time.time()))
+        for future in not_done:
+            future.cancel()
+
+        # Anything the search didn't get to keeps its place below the gods it
+        # did evaluate, in the order of the static ranking
+        values = {}
+        for future in done:
+            if future.exception() is None:
+                for god, value, _ in future.result():
+                    values[matchup_matrix.names[god]] = value
+
+        searched = sorted(
+            (god for god in ranked if god in values),
+            key=values.get,
+            reverse=True,
+        )
+        return (searched + [god for god in ranked if god not in values])[:amount]
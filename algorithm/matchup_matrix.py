@@ -0,0 +1,231 @@
+from collections.abc import Iterator
+from itertools import islice
+
+import numpy as np
+
+from data import GodData, MatchupStore, MatchupTable
+
+from .explanation import Explanation
+
+
+class MatchupMatrix:
+    def __init__(
+        self,
+        data: dict[str, GodData] | MatchupStore,
+        counters: dict[str, list[str]],
+    ):
+        # Rows are the gods you play as, columns the enemy gods. The gods in
+        # data come first so index order matches the iteration order of data.
+        self.data = data
+        self.names: list[str] = list(data)
+        self.index: dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.candidate_count = len(self.names)
+
+        # Normally every god of a player shares one table, but group them in
+        # case they don't. A store is a table of its own, read straight from
+        # its memory mapped counts.
+        tables: dict[int, tuple[MatchupTable, list[int], list[int]]] = {}
+        if isinstance(data, MatchupStore):
+            rows = list(range(self.candidate_count))
+            tables[id(data)] = (data, rows, rows)
+        else:
+            for i, god_data in enumerate(data.values()):
+                table, rows, table_rows = tables.setdefault(
+                    id(god_data.table), (god_data.table, [], [])
+                )
+                rows.append(i)
+                table_rows.append(god_data.row)
+        for table, _, _ in tables.values():
+            for enemy in table.names:
+                self._add_name(enemy)
+        for god_name, god_counters in counters.items():
+            self._add_name(god_name)
+            for counter in god_counters:
+                self._add_name(counter)
+
+        # Floats, since weighted data has fractional counts
+        size = len(self.names)
+        self.wins = np.zeros((size, size))
+        self.losses = np.zeros((size, size))
+        for table, rows, table_rows in tables.values():
+            table_columns = np.array(
+                [table.ids.get(name, -1) for name in self.names], dtype=np.int64
+            )
+            columns = np.flatnonzero(table_columns >= 0)
+            counts = table.counts[np.ix_(table_rows, table_columns[columns])]
+            self.wins[np.ix_(rows, columns)] = counts[..., 0]
+            self.losses[np.ix_(rows, columns)] = counts[..., 1]
+
+        # counter_positions[x, y] is the position of y in the counter list of
+        # x, or -1 if y doesn't counter x. The position decides the weight a
+        # counter gets, just like the order of the counter file does.
+        self.counter_positions = np.full((size, size), -1, dtype=np.int64)
+        for god_name, god_counters in counters.items():
+            row = self.index[god_name]
+            for position, counter in enumerate(god_counters):
+                column = self.index[counter]
+                if self.counter_positions[row, column] == -1:
+                    self.counter_positions[row, column] = position
+        self.counters = self.counter_positions >= 0
+
+        # countered_by[y] holds the candidates y counters and counters_of[y]
+        # the candidates that counter y, so a draft can find the gods a pick
+        # affects without scanning the whole matrix
+        candidates = self.counters[: self.candidate_count]
+        self.countered_by = [np.flatnonzero(column) for column in candidates.T]
+        self.counters_of = [
+            np.flatnonzero(row[: self.candidate_count]) for row in self.counters
+        ]
+
+        total = self.wins + self.losses
+        played = total > 0
+        safe_total = np.where(played, total, 1)
+        self.win_rates = np.where(played, self.wins / safe_total, 0.5)
+        self.lose_rates = np.where(played, self.losses / safe_total, 0.5)
+        self.own_win_rates = np.diagonal(self.win_rates)[: self.candidate_count]
+
+        if isinstance(data, MatchupStore):
+            self.values = data.god_values()
+        else:
+            self.values = np.array([god_data.value for god_data in data.values()])
+
+    def _add_name(self, name: str) -> None:
+        if name not in self.index:
+            self.index[name] = len(self.names)
+            self.names.append(name)
+
+    def active_picks(self, gods_picked: set[str], gods_banned: set[str]) -> np.ndarray:
+        return np.array(
+            sorted(
+                self.index[god]
+                for god in gods_picked
+                if god in self.index and god not in gods_banned
+            ),
+            dtype=np.int64,
+        )
+
+    def counter_penalties(self, rows, picks: np.ndarray) -> np.ndarray:
+        # Counters you face. The n-th counter of a god found among the picks
+        # weighs n times as much, so rank each active counter by its position.
+        positions = self.counter_positions[rows][:, picks]
+        active = positions >= 0
+        rank = (
+            active[:, None, :] & (positions[:, None, :] <= positions[:, :, None])
+        ).sum(axis=2)
+        lose_rates = self.lose_rates[rows][:, picks]
+        return -5 * (rank * lose_rates * active).sum(axis=1)
+
+    def counter_bonuses(self, rows, countered: np.ndarray) -> np.ndarray:
+        # Enemies you counter. Like get_best_gods, the rate is read from the
+        # god's own matchup entry, so every enemy countered adds the same rate.
+        return 5 * self.own_win_rates[rows] * countered * (countered + 1) / 2
+
+    def combine(self, counter_values: np.ndarray, rows=slice(None)) -> np.ndarray:
+        return counter_values / 3 * 2 + self.values[rows] / 3
+
+    def score(self, gods_picked: set[str], gods_banned: set[str]) -> np.ndarray:
+        picks = self.active_picks(gods_picked, gods_banned)
+        candidates = slice(0, self.candidate_count)
+        countered = self.counters[picks][:, candidates].sum(axis=0)
+        return self.combine(
+            self.counter_penalties(candidates, picks)
+            + self.counter_bonuses(candidates, countered)
+        )
+
+    def iter_ranked(
+        self, gods_picked: set[str], gods_banned: set[str], batch_size: int = 8
+    ) -> Iterator[str]:
+        if not gods_picked:
+            scores = self.values
+        else:
+            scores = self.score(gods_picked, gods_banned)
+        return self.iter_scores_ranked(scores, gods_banned | gods_picked, batch_size)
+
+    def iter_scores_ranked(
+        self, scores: np.ndarray, excluded: set[str], batch_size: int = 8
+    ) -> Iterator[str]:
+        allowed = np.ones(self.candidate_count, dtype=bool)
+        for god in excluded:
+            if self.index.get(god, self.candidate_count) < self.candidate_count:
+                allowed[self.index[god]] = False
+        remaining = np.flatnonzero(allowed)
+        # A batch of nothing would never get past the first one
+        batch_size = max(1, batch_size)
+
+        # Only the best batch_size gods are sorted at a time. Everything tied
+        # with the worst of them is kept in the partition so ties come out in
+        # data order, like a stable sort of every god would give.
+        while remaining.size:
+            amount = min(batch_size, remaining.size)
+            remaining_scores = scores[remaining]
+            if amount < remaining.size:
+                threshold = np.partition(remaining_scores, -amount)[-amount]
+                best = remaining[remaining_scores >= threshold]
+            else:
+                best = remaining
+            best = best[np.lexsort((best, -scores[best]))][:amount]
+
+            for i in best:
+                yield self.names[i]
+
+            remaining = remaining[~np.isin(remaining, best)]
+            batch_size *= 2
+
+    def rank(
+        self, gods_picked: set[str], gods_banned: set[str], amount: int = 1
+    ) -> list[str]:
+        if amount <= 0:
+            return []
+        return list(
+            islice(self.iter_ranked(gods_picked, gods_banned, amount), amount)
+        )
+
+    def explanations(
+        self,
+        gods_picked: set[str],
+        gods_banned: set[str],
+        gods: list[str] | None = None,
+    ) -> list[Explanation]:
+        picks = self.active_picks(gods_picked, gods_banned)
+        excluded = gods_banned | gods_picked
+        candidates = slice(0, self.candidate_count)
+        positions = self.counter_positions[candidates][:, picks]
+        you_counter = self.counters[picks][:, candidates].T
+
+        if gods is None:
+            involved = (positions >= 0).any(axis=1) | you_counter.any(axis=1)
+            rows = np.flatnonzero(involved)
+        else:
+            rows = [self.index[god] for god in gods]
+
+        explanations = []
+        for i in rows:
+            god_name = self.names[i]
+            if god_name in excluded:
+                continue
+
+            for j in sorted(np.flatnonzero(positions[i] >= 0), key=positions[i].item):
+                enemy = picks[j]
+                played = self.wins[i, enemy] + self.losses[i, enemy] > 0
+                explanations.append(
+                    Explanation(
+                        god_name,
+                        self.names[enemy],
+                        False,
+                        float(self.lose_rates[i, enemy]) if played else None,
+                    )
+                )
+
+            # Like get_best_gods, the rate is the god's own matchup entry
+            played = self.wins[i, i] + self.losses[i, i] > 0
+            for j in np.flatnonzero(you_counter[i]):
+                explanations.append(
+                    Explanation(
+                        god_name,
+                        self.names[picks[j]],
+                        True,
+                        float(self.win_rates[i, i]) if played else None,
+                    )
+                )
+
+        return explanations
@@ -21,7 +21,10 @@ class Console:
         self.message_count = 0
         self.scroll = 0
 
-        self.messages: list[tuple[str, str]] = []
+        # Messages are stored as they come and only turned into text when
+        # they're displayed, so explanations that never scroll into view
+        # are never rendered
+        self.messages: list[tuple[int, object, str]] = []
     
     def get_font(self, width, height, text):
         font_size = self.font_size
@@ -55,11 +58,10 @@ class Console:
                 messages = self.messages[-self.max_displayed_messages:]
             else:
                 messages = self.messages[-self.max_displayed_messages - self.scroll:-self.scroll]
-            actual_messages = [message[0] for message in messages]
+            actual_messages = [f"{number}: {message}" for number, message, _ in messages]
             font = self.get_font(width * 0.9, height * 0.9, max(actual_messages, key=len))
             text_height = height / self.max_displayed_messages
-            for i, message in enumerate(messages):
-                message, message_type = message
+            for i, (message, (_, _, message_type)) in enumerate(zip(actual_messages, messages)):
                 if message_type == "normal":
                     color = self.text_normal_color
                 elif message_type == "warning":
@@ -76,9 +78,11 @@ class Console:
 
         return window.blit(surface, self.surface_rect)
             
-    def add_message(self, message, message_type):
+    def add_message(self, message, message_type=None):
+        if message_type is None:
+            message_type = message.message_type
         self.message_count += 1
-        self.messages.append((f"{self.message_count}: {message}", message_type))
+        self.messages.append((self.message_count, message, message_type))
     
     def clear(self):
         self.message_count = 0
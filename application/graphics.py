@@ -4,6 +4,8 @@ import threading
 
 import pygame
 
+from data import MatchLog, RecencyStats
+
 from .button import Button
 from .check_box import CheckBox
 from .console import Console
@@ -176,6 +178,8 @@ class App:
         self.data = {}
         self.god_picker = god_picker
         self.scrape = None
+        self.filepath = None
+        self.recency_stats: dict[str, RecencyStats] = {}
 
     def save_settings(self):
         self.settings["scrapeAfterRecommendation"] = self.scrape_check_box.get_state()
@@ -212,6 +216,17 @@ class App:
         area = self.console.draw(self.window, *self.window_size)
         self.draw(area)
 
+    def get_recency_stats(self) -> RecencyStats | None:
+        # Kept per player and only fed the matches logged since last time.
+        # recencyWeighting and recencyWindowDays only reach matches found by
+        # updates, timed by when they were scraped, the rest of a player's
+        # history always counts in full, see RecencyStats.
+        if not self.settings.get("recencyWeighting") or self.filepath is None:
+            return None
+        recency = self.recency_stats.setdefault(self.filepath, RecencyStats())
+        recency.update_from_log(MatchLog(MatchLog.path_for(self.filepath)))
+        return recency
+
     def quit(self) -> None:
         pygame.quit()
         sys.exit()
@@ -261,6 +276,19 @@ class App:
                 return
 
         filepath = f"files/gods_data_{name}.pkl"
+        self.filepath = filepath
+
+        if self.settings["disableScraping"]:
+            # Nothing to scrape, so a player loaded before is ready right away
+            data = self.api_scraper_bot.get_cached_data(filepath)
+            if data is not None:
+                self.data["data"] = data
+                self.console.clear()
+                self.console.add_message("Loaded cached data", "normal")
+                area = self.console.draw(self.window, *self.window_size)
+                self.draw(area)
+                return
+        self.api_scraper_bot.browser_workers = self.settings.get("browserWorkers", 1)
         self.scrape = threading.Thread(
             target=self.api_scraper_bot.get_player_data,
             daemon=True,
@@ -268,6 +296,7 @@ class App:
         )
 
         self.data["gods_completed"] = 0
+        self.data.pop("god_count", None)
         self.loading_bar.reset()
         area = self.loading_bar.draw(self.window, *self.window_size)
         self.draw(area)
@@ -287,17 +316,26 @@ class App:
         while running:
             clock.tick(self.FPS)
 
+            loading_bar_changed = False
             if "god_count" in self.data:
-                self.loading_bar.set_max_value(self.data["god_count"])
+                if self.loading_bar.set_max_value(self.data["god_count"]):
+                    loading_bar_changed = True
 
             if "gods_completed" in self.data:
                 if self.loading_bar.update_progress(self.data["gods_completed"]):
-                    area = self.loading_bar.draw(self.window, *self.window_size)
-                    self.draw(area)
+                    loading_bar_changed = True
+
+            if loading_bar_changed:
+                area = self.loading_bar.draw(self.window, *self.window_size)
+                self.draw(area)
 
             if "messages" in self.data:
                 if self.data["messages"]:
-                    self.console.add_message(*self.data["messages"][0])
+                    message = self.data["messages"][0]
+                    if isinstance(message, tuple):
+                        self.console.add_message(*message)
+                    else:
+                        self.console.add_message(message)
                     del self.data["messages"][0]
                     area = self.console.draw(self.window, *self.window_size)
                     self.draw(area)
@@ -364,6 +402,10 @@ class App:
                                         gods_banned,
                                         self.data["messages"],
                                         amount=int(self.settings["amountGods"]),
+                                        recency=self.get_recency_stats(),
+                                        window_days=self.settings.get(
+                                            "recencyWindowDays"
+                                        ),
                                     )
 
                                     god_data = [
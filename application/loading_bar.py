@@ -28,10 +28,10 @@ class LoadingBar:
             surface, self.border_color, (0, 0, width, height), self.border_width
         )
 
-        if self.max_value is None:
+        if not self.max_value:
             progress_percent = 0
         else:
-            progress_percent = self.progress / self.max_value
+            progress_percent = min(self.progress / self.max_value, 1)
 
         pygame.draw.rect(
             surface, self.fill_color, (0, 0, width * progress_percent, height)
@@ -39,12 +39,14 @@ class LoadingBar:
 
         return window.blit(surface, surface_rect)
 
-    def set_max_value(self, value):
-        if self.max_value is not None:
-            return
+    def set_max_value(self, value) -> bool:
+        # The scraper's total can be an estimate that changes as it goes
+        prev_max_value = self.max_value
 
         self.max_value = value
 
+        return self.max_value != prev_max_value
+
     def update_progress(self, progress) -> bool:
         prev_progress = self.progress
 
@@ -56,5 +58,6 @@ class LoadingBar:
         prev_progress = self.progress
 
         self.progress = self.default_value
+        self.max_value = None
 
         return self.progress != prev_progress
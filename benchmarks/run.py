@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from algorithm import CounterCheck, GodPicker
+from data import APIScraperBot
+
+from .synthetic import SCALES, generate_counters, generate_data, generate_drafts
+
+
+def measure(func, repeat: int = 5) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def run_scale(scale: str, repeat: int) -> dict[str, dict[str, float]]:
+    god_count, match_count = SCALES[scale]
+    results = {}
+
+    # Generating the data is one GodData update per match, so it's timed
+    # once and reported per update
+    start = time.perf_counter()
+    data = generate_data(god_count, match_count)
+    update_time = (time.perf_counter() - start) / match_count
+    results["god_data_updates"] = {"min": update_time, "median": update_time}
+
+    with tempfile.TemporaryDirectory() as directory:
+        counters_file = os.path.join(directory, "god_counters.txt")
+        generate_counters(god_count, counters_file)
+        results["counter_read_data"] = measure(
+            lambda: CounterCheck(counters_file), repeat
+        )
+
+        bot = APIScraperBot("", show_window=False)
+        bot.output = {"messages": []}
+        data_file = os.path.join(directory, "gods_data_bench.pkl")
+        results["save_data"] = measure(
+            lambda: bot.save_data(data, set(), data_file), repeat
+        )
+        results["load_previous_data"] = measure(
+            lambda: bot.load_previous_data(data_file), repeat
+        )
+
+        god_picker = GodPicker(counters_file)
+        drafts = generate_drafts(god_count, 200)
+        results["build_matchup_matrix"] = measure(
+            lambda: god_picker.get_matchup_matrix(dict(data)), repeat
+        )
+
+        def get_best_gods():
+            for gods_picked, gods_banned in drafts:
+                god_picker.get_best_gods(data, gods_picked, gods_banned, [], 4)
+            god_picker.recommendation_cache.clear()
+
+        # Build the matrix outside the timed runs, drafts then only pay for
+        # scoring. Times are per draft.
+        god_picker.get_matchup_matrix(data)
+        timing = measure(get_best_gods, repeat)
+        results["get_best_gods"] = {
+            key: value / len(drafts) for key, value in timing.items()
+        }
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for scale, benchmarks in results["scales"].items():
+        for name, timing in benchmarks.items():
+            previous = baseline.get("scales", {}).get(scale, {}).get(name)
+            if previous is None:
+                continue
+            change = timing["min"] / previous["min"] - 1
+            timing["change"] = change
+            if change > threshold:
+                regressions.append(
+                    f"{scale}/{name}: {previous['min']:.6f}s -> "
+                    f"{timing['min']:.6f}s ({change:+.0%})"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the recommendation and data paths"
+    )
+    parser.add_argument(
+        "--scales", nargs="+", default=["small", "medium"], choices=SCALES
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Slowdown, as a fraction, that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scales": {},
+    }
+    for scale in args.scales:
+        print(f"Running {scale} {SCALES[scale]}")
+        results["scales"][scale] = run_scale(scale, args.repeat)
+        for name, timing in results["scales"][scale].items():
+            print(f"  {name}: {timing['min']:.6f}s")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"Saved results to {args.output}")
+
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
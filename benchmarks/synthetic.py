@@ -0,0 +1,57 @@
+import random
+
+from data import GodData, create_data
+
+SCALES = {
+    "small": (118, 1_000),
+    "medium": (118, 100_000),
+    "large": (500, 100_000),
+    "huge": (1_000, 1_000_000),
+}
+
+
+def god_names(god_count: int) -> list[str]:
+    with open("files/all_gods.txt") as f:
+        names = [god.strip() for god in f]
+    names += [f"God {i}" for i in range(len(names), god_count)]
+    return names[:god_count]
+
+
+def generate_data(
+    god_count: int, match_count: int, seed: int = 0
+) -> dict[str, GodData]:
+    rng = random.Random(seed)
+    names = god_names(god_count)
+    data = create_data(names)
+    for _ in range(match_count):
+        god_name, *enemy_gods = rng.sample(names, 6)
+        if rng.random() < 0.5:
+            data[god_name].win_against(enemy_gods)
+        else:
+            data[god_name].lose_against(enemy_gods)
+    return data
+
+
+def generate_counters(god_count: int, filepath: str, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    names = god_names(god_count)
+    lines = []
+    for god in names:
+        others = [name for name in names if name != god]
+        counters = rng.sample(others, rng.randint(1, 8))
+        lines.append(",".join([god] + counters))
+    with open(filepath, "w") as f:
+        f.write("\n".join(lines))
+
+
+def generate_drafts(
+    god_count: int, draft_count: int, seed: int = 0
+) -> list[tuple[set[str], set[str]]]:
+    rng = random.Random(seed)
+    names = god_names(god_count)
+    drafts = []
+    for _ in range(draft_count):
+        gods = rng.sample(names, 15)
+        picks = rng.randint(0, 5)
+        drafts.append((set(gods[:picks]), set(gods[5 : 5 + rng.randint(0, 10)])))
+    return drafts
@@ -1 +1,12 @@
+from .aggregate import *
+from .checkpoint import *
+from .dataset_cache import *
+from .http_client import *
+from .http_scraper import *
+from .match_log import *
+from .matchup_store import *
+from .matchups import *
+from .recency import *
 from .scrape import *
+from .seen_index import *
+from .sqlite_store import *
@@ -0,0 +1,152 @@
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .dataset_cache import files_key
+from .match_log import MatchLog
+from .matchup_store import MatchupStore
+from .matchups import MatchupTable
+from .scrape import GodData, load_data
+
+
+@dataclass(slots=True)
+class PlayerContribution:
+    # One player's data as arrays. The first god_count names are the gods of
+    # the data, the rest are enemies that only show up in matchups.
+    names: list[str]
+    god_count: int
+    totals: np.ndarray
+    counts: np.ndarray
+
+
+def file_key(filepath: str) -> tuple:
+    # Changes whenever the data file or its match log is written to
+    return files_key([filepath, MatchLog.path_for(filepath)])
+
+
+def load_contribution(filepath: str) -> PlayerContribution:
+    if filepath.endswith(".matchups"):
+        store = MatchupStore(filepath)
+        return PlayerContribution(
+            store.names,
+            store.god_count,
+            np.array(store.totals, dtype=np.int64),
+            np.array(store.counts, dtype=np.int64),
+        )
+
+    data, _ = load_data(filepath)
+    table = next(iter(data.values())).table
+    names = list(data)
+    names += [name for name in table.names if name not in data]
+    table_ids = np.array([table.ids[name] for name in names], dtype=np.int64)
+    totals = np.array(
+        [[god_data.total_wins, god_data.total_losses] for god_data in data.values()],
+        dtype=np.int64,
+    ).reshape(len(data), 2)
+    return PlayerContribution(
+        names,
+        len(data),
+        totals,
+        table.counts[np.ix_(table_ids, table_ids)].astype(np.int64),
+    )
+
+
+class DatasetAggregator:
+    # Pools the data of many players into one dataset the GodPicker can use
+    # like a single player's. Files are loaded on a process pool, and every
+    # player's counts are kept so that when one file changes only that
+    # player is loaded again, subtracted and added back.
+    def __init__(self, workers: int | None = None):
+        self.workers = workers
+        self.pool: ProcessPoolExecutor | None = None
+
+        self.table = MatchupTable()
+        self.totals = np.zeros((self.table.counts.shape[0], 2), dtype=np.int64)
+        self.god_players: Counter[str] = Counter()
+
+        self.players: dict[str, PlayerContribution] = {}
+        self.keys: dict[str, tuple] = {}
+        self.ids: dict[str, np.ndarray] = {}
+
+    def update(self, filepaths: Iterable[str]) -> dict[str, GodData]:
+        # Syncs the pooled data with filepaths, loading only the files that
+        # are new or changed and dropping the players that aren't listed
+        filepaths = list(dict.fromkeys(filepaths))
+        for filepath in set(self.players) - set(filepaths):
+            self.remove(filepath)
+
+        keys = {filepath: file_key(filepath) for filepath in filepaths}
+        changed = [
+            filepath
+            for filepath in filepaths
+            if self.keys.get(filepath) != keys[filepath]
+        ]
+
+        if len(changed) > 1:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            contributions = self.pool.map(load_contribution, changed)
+        else:
+            contributions = map(load_contribution, changed)
+
+        for filepath, contribution in zip(changed, contributions):
+            self.remove(filepath)
+            self.add(filepath, contribution)
+            self.keys[filepath] = keys[filepath]
+
+        return self.data()
+
+    def add(self, filepath: str, contribution: PlayerContribution) -> None:
+        ids = np.array(
+            [self.table.intern(name) for name in contribution.names], dtype=np.int64
+        )
+        if self.totals.shape[0] < self.table.counts.shape[0]:
+            totals = np.zeros((self.table.counts.shape[0], 2), dtype=np.int64)
+            totals[: self.totals.shape[0]] = self.totals
+            self.totals = totals
+
+        self.table.counts[np.ix_(ids, ids)] += contribution.counts.astype(np.int32)
+        self.totals[ids[: contribution.god_count]] += contribution.totals
+        self.god_players.update(contribution.names[: contribution.god_count])
+
+        self.players[filepath] = contribution
+        self.ids[filepath] = ids
+
+    def remove(self, filepath: str) -> None:
+        if filepath not in self.players:
+            return
+
+        contribution = self.players.pop(filepath)
+        ids = self.ids.pop(filepath)
+        del self.keys[filepath]
+
+        self.table.counts[np.ix_(ids, ids)] -= contribution.counts.astype(np.int32)
+        self.totals[ids[: contribution.god_count]] -= contribution.totals
+        self.god_players.subtract(contribution.names[: contribution.god_count])
+
+    def data(self) -> dict[str, GodData]:
+        # A fresh copy every time, so a GodPicker holding an older one can
+        # tell the data changed
+        size = len(self.table.names)
+        table = MatchupTable(max(128, size))
+        for name in self.table.names:
+            table.intern(name)
+        table.counts[:size, :size] = self.table.counts[:size, :size]
+
+        data = {}
+        for god_name in self.table.names:
+            if self.god_players[god_name]:
+                god_data = GodData(god_name, table)
+                god_id = self.table.ids[god_name]
+                god_data.total_wins = int(self.totals[god_id, 0])
+                god_data.total_losses = int(self.totals[god_id, 1])
+                data[god_name] = god_data
+        return data
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
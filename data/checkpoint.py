@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import copy
+import json
+import os
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from .match_log import MatchRecord
+from .seen_index import SeenIndex
+
+if TYPE_CHECKING:
+    from .scrape import APIScraperBot
+
+
+def resume_marker_path(filepath: str) -> str:
+    return os.path.splitext(filepath)[0] + ".resume"
+
+
+def read_resume_marker(filepath: str) -> dict | None:
+    try:
+        with open(resume_marker_path(filepath)) as marker_file:
+            marker = json.load(marker_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(marker, dict) or "match_id" not in marker:
+        return None
+    return marker
+
+
+def write_resume_marker(filepath: str, marker: dict) -> None:
+    marker_filepath = resume_marker_path(filepath)
+    with open(marker_filepath + ".tmp", "w") as marker_file:
+        json.dump(marker, marker_file)
+        marker_file.flush()
+        os.fsync(marker_file.fileno())
+    os.replace(marker_filepath + ".tmp", marker_filepath)
+
+
+def clear_resume_marker(filepath: str) -> None:
+    try:
+        os.remove(resume_marker_path(filepath))
+    except FileNotFoundError:
+        pass
+
+
+class Checkpointer:
+    # Saves a scrape while it's still running, so a crash, a hung browser or
+    # closing the window only loses the last few matches. Every
+    # CHECKPOINT_EVERY matches or CHECKPOINT_SECONDS seconds the new matches
+    # are handed to a writer thread that appends them to the match log, and
+    # once enough have been logged it writes a snapshot like a finished
+    # scrape would. The scrape loop never waits on the disk.
+    #
+    # Stopping at the first match we already have only works if the seen
+    # matches are one unbroken run, newest first, and an unfinished scrape
+    # leaves the newest part of the history saved with a gap below it. So
+    # along with every batch it saves a resume marker, the oldest match the
+    # scrape got to. The next scrape skips over seen matches until it's past
+    # that one and only then stops at a seen match. A scrape that finishes
+    # removes the marker.
+    CHECKPOINT_EVERY = 10
+    CHECKPOINT_SECONDS = 30.0
+
+    def __init__(self, bot: APIScraperBot, filepath: str, prev_seen: SeenIndex):
+        self.bot = bot
+        self.filepath = filepath
+        self.prev_seen = prev_seen
+        self.new_seen: set[str] = set()
+        self.pending: list[MatchRecord] = []
+        self.last_checkpoint = time.monotonic()
+        self.since_snapshot = bot.matches_since_snapshot
+
+        self.marker = read_resume_marker(filepath)
+        self.past_marker = self.marker is None
+        # Only matches found by an update are close to when they were played,
+        # see match_time, and a resumed scrape is still the scrape it resumes
+        if self.marker is None:
+            self.timed = bool(len(prev_seen))
+        else:
+            self.timed = bool(self.marker.get("timed"))
+        self.frontier = None if self.marker is None else self.marker["match_id"]
+
+        # Matches a write failed for, they go along with the next one
+        self.unsaved: list[MatchRecord] = []
+
+        self.jobs: queue.Queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write, daemon=True)
+        self.writer.start()
+
+    def stops_at(self, match_id: str) -> bool:
+        # Whether a match we already have ends the scrape, given in history
+        # order. Before the marker it's part of what was already scraped.
+        if self.past_marker:
+            return True
+        if match_id == self.marker["match_id"]:
+            self.past_marker = True
+        return False
+
+    def match_time(self) -> float:
+        # The match pages don't say when a match was played. Matches newer
+        # than what was scraped before were played since, so now is close
+        # enough, but a first scrape goes through the whole history.
+        if self.timed or not self.past_marker:
+            return time.time()
+        return 0.0
+
+    def add(self, record: MatchRecord) -> None:
+        self.pending.append(record)
+        self.new_seen.add(record.match_id)
+        if not self.past_marker and record.match_id == self.marker["match_id"]:
+            # The marker can be ahead of the log if saving it failed
+            self.past_marker = True
+        if self.past_marker:
+            self.frontier = record.match_id
+        if (
+            len(self.pending) >= self.CHECKPOINT_EVERY
+            or time.monotonic() - self.last_checkpoint >= self.CHECKPOINT_SECONDS
+        ):
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        self.last_checkpoint = time.monotonic()
+        if not self.pending:
+            return
+
+        marker = {"match_id": self.frontier, "timed": self.timed}
+        self.jobs.put(("matches", (self.pending, marker)))
+        self.since_snapshot += len(self.pending)
+        self.pending = []
+
+        if self.since_snapshot >= self.bot.SNAPSHOT_EVERY:
+            # The scrape keeps changing the data, so the writer gets a copy
+            self.jobs.put(
+                (
+                    "snapshot",
+                    (copy.deepcopy(self.bot.data), self.prev_seen | self.new_seen),
+                )
+            )
+            self.since_snapshot = 0
+
+    def write(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+
+            kind, payload = job
+            if kind == "matches":
+                payload, marker = payload
+                payload = self.unsaved + payload
+                self.unsaved = []
+            # Anything can go wrong here, a full disk or a locked database,
+            # and the writer has to keep going either way or every later
+            # checkpoint is silently dropped
+            try:
+                if kind == "matches":
+                    # The marker goes first. One that's ahead of the log only
+                    # means scraping a few matches again, one that's behind
+                    # would leave a gap.
+                    write_resume_marker(self.filepath, marker)
+                    self.bot.save_matches(payload, self.filepath)
+                else:
+                    self.bot.save_data(*payload, self.filepath)
+            except Exception as e:
+                if kind == "matches":
+                    self.unsaved = payload
+                self.bot.output["messages"].append(
+                    (f"Couldn't save a checkpoint: {e}", "warning")
+                )
+
+    def close(self, finished: bool = False) -> None:
+        # Save whatever is left and wait for the writer to finish. A scrape
+        # that got to its end no longer needs its marker.
+        self.checkpoint()
+        self.jobs.put(None)
+        self.writer.join()
+        if self.unsaved:
+            # One last try, then let get_player_data know
+            try:
+                self.bot.save_matches(self.unsaved, self.filepath)
+            except Exception:
+                self.bot.output["messages"].append(
+                    (f"Couldn't save {len(self.unsaved)} scraped matches", "error")
+                )
+                raise
+            self.unsaved = []
+        if finished:
+            clear_resume_marker(self.filepath)
@@ -0,0 +1,57 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+
+def files_key(filepaths: Iterable[str]) -> tuple:
+    # Changes whenever one of the files is written to, created or deleted
+    key = []
+    for filepath in filepaths:
+        try:
+            stat = os.stat(filepath)
+            key.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            key.append(None)
+    return tuple(key)
+
+
+class DatasetCache:
+    # Player datasets that were already loaded, so switching between players
+    # doesn't go back to disk. An entry is only handed out while the files it
+    # was loaded from still have the same mtime and size, and the least
+    # recently used one is dropped once there are more than max_size. The
+    # scraper thread fills it while the app reads it, hence the lock.
+    def __init__(self, max_size: int = 4):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple[tuple, object]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, filepath: str, sources: Iterable[str]):
+        key = files_key(sources)
+        with self.lock:
+            entry = self.entries.get(filepath)
+            if entry is None or entry[0] != key:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(filepath)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, filepath: str, sources: Iterable[str], data) -> None:
+        key = files_key(sources)
+        with self.lock:
+            self.entries[filepath] = (key, data)
+            self.entries.move_to_end(filepath)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, filepath: str) -> None:
+        with self.lock:
+            self.entries.pop(filepath, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
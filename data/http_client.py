@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+import http.client
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+
+class HTTPError(OSError):
+    def __init__(self, url: str, status: int):
+        super().__init__(f"{url} returned HTTP {status}")
+        self.url = url
+        self.status = status
+
+
+class RateLimiter:
+    # Spaces out request starts to at most rate per second. Start times are
+    # handed out under a thread lock rather than an asyncio one, so a single
+    # limiter covers blocking requests and every event loop a scrape runs.
+    def __init__(self, rate: float | None):
+        self.interval = 1 / rate if rate else 0.0
+        self.next_start = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # How long to wait before starting the request
+        if not self.interval:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        return start - now
+
+    def wait(self) -> None:
+        time.sleep(self.reserve())
+
+    async def wait_async(self) -> None:
+        await asyncio.sleep(self.reserve())
+
+
+class HTTPSession:
+    # Minimal keep-alive HTTP client. Connections are pooled per host and
+    # reused across requests and threads, and responses are asked for
+    # gzipped. Only what the scrapers need: GET.
+    def __init__(self, max_connections: int = 8, timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.headers = {
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": "Smite-Godpicker",
+        }
+        self.pools: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self.lock = threading.Lock()
+
+    def connection(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        with self.lock:
+            pool = self.pools.setdefault((scheme, host), [])
+            if pool:
+                return pool.pop()
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, timeout=self.timeout)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def release(
+        self, scheme: str, host: str, connection: http.client.HTTPConnection
+    ) -> None:
+        with self.lock:
+            pool = self.pools.setdefault((scheme, host), [])
+            if len(pool) < self.max_connections:
+                pool.append(connection)
+                return
+        connection.close()
+
+    def get(self, url: str) -> bytes:
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        # A pooled connection the server already closed fails on first use,
+        # so retry once on a fresh one
+        for attempt in range(2):
+            connection = self.connection(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", path, headers=self.headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                if attempt:
+                    raise
+                continue
+
+            if response.will_close:
+                connection.close()
+            else:
+                self.release(parts.scheme, parts.netloc, connection)
+            break
+
+        if response.status >= 400:
+            raise HTTPError(url, response.status)
+
+        encoding = response.getheader("Content-Encoding", "")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return body
+
+    def get_text(self, url: str) -> str:
+        return self.get(url).decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        with self.lock:
+            for pool in self.pools.values():
+                for connection in pool:
+                    connection.close()
+            self.pools.clear()
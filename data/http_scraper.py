@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin, urlsplit
+
+from .dataset_cache import DatasetCache
+from .http_client import HTTPSession, RateLimiter
+from .match_log import MatchRecord
+from .scrape import APIScraperBot, apply_match
+from .seen_index import SeenIndex
+
+if TYPE_CHECKING:
+    from .sqlite_store import SQLiteStore
+
+# Elements that never have an end tag
+VOID_TAGS = set(
+    "area base br col embed hr img input link meta source track wbr".split()
+)
+
+
+class Element:
+    # Just enough of an HTML element to find things by class name, the way
+    # the Selenium scraper finds them in the browser
+    def __init__(self, tag: str, attrs: list[tuple[str, str | None]]):
+        self.tag = tag
+        self.attrs = {name: value or "" for name, value in attrs}
+        self.classes = set(self.attrs.get("class", "").split())
+        self.children: list[Element | str] = []
+
+    def iter_text(self) -> Iterator[str]:
+        for child in self.children:
+            if isinstance(child, str):
+                yield child
+            else:
+                yield from child.iter_text()
+
+    @property
+    def text(self) -> str:
+        # Whitespace collapsed like a browser shows it
+        return " ".join("".join(self.iter_text()).split())
+
+    def find_all(self, class_name: str) -> list[Element]:
+        found = []
+        for child in self.children:
+            if isinstance(child, Element):
+                if class_name in child.classes:
+                    found.append(child)
+                found.extend(child.find_all(class_name))
+        return found
+
+    def find(self, class_name: str) -> Element:
+        found = self.find_all(class_name)
+        if not found:
+            raise ValueError(f"No {class_name} on the page")
+        return found[0]
+
+
+class PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.root = Element("document", [])
+        self.open = [self.root]
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        element = Element(tag, attrs)
+        self.open[-1].children.append(element)
+        if tag not in VOID_TAGS:
+            self.open.append(element)
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        self.open[-1].children.append(Element(tag, attrs))
+
+    def handle_endtag(self, tag: str) -> None:
+        # Close whatever was left open inside it too
+        for index in range(len(self.open) - 1, 0, -1):
+            if self.open[index].tag == tag:
+                del self.open[index:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        self.open[-1].children.append(data)
+
+
+def parse_html(html: str) -> Element:
+    parser = PageParser()
+    parser.feed(html)
+    parser.close()
+    return parser.root
+
+
+class HTTPScraperBot(APIScraperBot):
+    # Scrapes the same match history as APIScraperBot, but fetches the pages
+    # over plain HTTP and reads them with an HTML parser instead of driving a
+    # browser through them. It looks for the same classes the browser does:
+    # the ind-match-container of every match on a history page, with its
+    # god-name and the view match link in nav-to-match, the next-btn link to
+    # the next page, and the match-id and team containers of a match page.
+    # Everything else, from loading and saving to the output dict, is
+    # APIScraperBot's.
+    #
+    # The profile url is the first history page, so pointing the bot at a
+    # local server with recorded pages works the same, see tests/fixtures.
+    #
+    # The match links of a history page are collected first, then the match
+    # pages are fetched concurrently, at most concurrency at a time, and
+    # applied in page order. Every request, history pages included, goes
+    # through the one RateLimiter of its host, at most requests_per_second.
+    MATCH_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        session: HTTPSession | None = None,
+        sqlite_store: SQLiteStore | None = None,
+        dataset_cache: DatasetCache | None = None,
+        concurrency: int = 8,
+        requests_per_second: float | None = 20.0,
+    ):
+        super().__init__(
+            "",
+            show_window=False,
+            sqlite_store=sqlite_store,
+            dataset_cache=dataset_cache,
+        )
+        self.concurrency = max(1, concurrency)
+        self.session = session or HTTPSession(max_connections=self.concurrency)
+        self.requests_per_second = requests_per_second
+        self.limiters: dict[str, RateLimiter] = {}
+        self.limiters_lock = threading.Lock()
+        self.profile_url = ""
+        self.first_page = ""
+
+    def limiter(self, url: str) -> RateLimiter:
+        host = urlsplit(url).netloc
+        with self.limiters_lock:
+            if host not in self.limiters:
+                self.limiters[host] = RateLimiter(self.requests_per_second)
+            return self.limiters[host]
+
+    def get_page(self, url: str) -> str:
+        self.limiter(url).wait()
+        return self.session.get_text(url)
+
+    def open_profile(self, smitesource_url: str) -> bool:
+        self.profile_url = smitesource_url
+        try:
+            self.first_page = self.get_page(smitesource_url)
+        except OSError:
+            return False
+        return True
+
+    def read_history_page(
+        self, html: str, url: str
+    ) -> tuple[list[tuple[str, bool, str]], str | None]:
+        # ([(god, won, match url)], the next page's url if there is one)
+        page = parse_html(html)
+        matches = []
+        for container in page.find_all("ind-match-container"):
+            link = container.find("nav-to-match").find("alt--text")
+            if not link.attrs.get("href"):
+                raise ValueError(f"A match on {url} has no link")
+            matches.append(
+                (
+                    container.find("god-name").text,
+                    "loss" not in container.classes,
+                    urljoin(url, link.attrs["href"]),
+                )
+            )
+
+        next_buttons = page.find_all(self.NEXT_PAGE_CLASS)
+        if not next_buttons or not next_buttons[0].attrs.get("href"):
+            return matches, None
+        return matches, urljoin(url, next_buttons[0].attrs["href"])
+
+    def read_match_page(self, html: str, won: bool) -> tuple[str, list[str]]:
+        # (match id, enemy gods), see APIScraperBot.read_enemy_gods. The page
+        # has a copy of the team boxes before the one the browser reads, so
+        # it's the last of each.
+        page = parse_html(html)
+        match_id = page.find(self.MATCH_ID_CLASS).text
+        if not match_id:
+            raise ValueError("The match page has no match id")
+
+        team_one_container = page.find_all("team-one-container")[-1:]
+        team_two_container = page.find_all("team-two-container")[-1:]
+        if not team_one_container or not team_two_container:
+            raise ValueError(f"Match {match_id} has no teams")
+
+        result = team_one_container[0].find("match-result").text
+        if (result == "Winning Team") != won:
+            enemy_container = team_one_container[0]
+        else:
+            enemy_container = team_two_container[0]
+        enemy_gods = [
+            player.find("god-name").text
+            for player in enemy_container.find_all("player-container")
+        ]
+        return match_id, enemy_gods
+
+    def read_match(self, match_url: str, won: bool) -> tuple[str, list[str]]:
+        return self.read_match_page(self.session.get_text(match_url), won)
+
+    async def fetch_matches(
+        self, matches: list[tuple[str, bool, str]], executor: ThreadPoolExecutor
+    ) -> list:
+        # read_match of every match in order, or the exception it still
+        # raised after MATCH_ATTEMPTS tries. The blocking requests run on
+        # executor.
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(match_url: str, won: bool):
+            async with semaphore:
+                for attempt in range(self.MATCH_ATTEMPTS):
+                    await self.limiter(match_url).wait_async()
+                    try:
+                        return await loop.run_in_executor(
+                            executor, self.read_match, match_url, won
+                        )
+                    except (OSError, ValueError):
+                        if attempt == self.MATCH_ATTEMPTS - 1:
+                            raise
+
+        return await asyncio.gather(
+            *(fetch(match_url, won) for _, won, match_url in matches),
+            return_exceptions=True,
+        )
+
+    def stop_early(self, error: Exception) -> None:
+        # Going past a match we couldn't read would leave a gap the next
+        # scrape never fills, so stop before it. The resume marker is at the
+        # last match we got, and the next scrape picks up from there.
+        self.scrape_finished = False
+        self.output["god_count"] = self.output["gods_completed"]
+        self.output["messages"].append((f"Couldn't read a page: {error}", "error"))
+        self.output["messages"].append(("Stopping scrape", "warning"))
+
+    def get_matches(self, prev_seen: SeenIndex) -> set[str]:
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return self.scrape_history(prev_seen, executor)
+
+    def scrape_history(
+        self, prev_seen: SeenIndex, executor: ThreadPoolExecutor
+    ) -> set[str]:
+        # Same walk as APIScraperBot.get_matches: newest first, stopping at
+        # the first match we already have once past the resume marker, and
+        # god_count grows as pages turn up. The rest of a page is fetched
+        # along with the match it stops at, nothing after that page is.
+        seen = set()
+        self.output["gods_completed"] = 0
+        matches_found = 0
+
+        url = self.profile_url
+        html = self.first_page
+        while True:
+            try:
+                matches, next_url = self.read_history_page(html, url)
+            except ValueError as error:
+                self.stop_early(error)
+                return seen
+            matches_found += len(matches)
+            self.output["god_count"] = matches_found + (len(matches) if next_url else 0)
+
+            details = asyncio.run(self.fetch_matches(matches, executor))
+            for (god_name, won, _), detail in zip(matches, details):
+                if isinstance(detail, (OSError, ValueError)):
+                    self.stop_early(detail)
+                    return seen
+                if isinstance(detail, BaseException):
+                    raise detail
+                match_id, enemy_gods = detail
+
+                if match_id in prev_seen:
+                    if not self.checkpointer.stops_at(match_id):
+                        # Already scraped by a scrape that didn't finish
+                        continue
+                    self.output["messages"].append((f"Found old {match_id}", "normal"))
+                    self.output["messages"].append(("Stopping scrape", "normal"))
+                    self.output["god_count"] = self.output["gods_completed"]
+                    return seen
+                if match_id in seen:
+                    continue
+
+                self.output["messages"].append(
+                    (f"New match found: {match_id}", "normal")
+                )
+                self.output["messages"].append(
+                    (
+                        f"You {'won' if won else 'lost'} as {god_name}",
+                        "normal" if won else "error",
+                    )
+                )
+                seen.add(match_id)
+
+                record = MatchRecord(
+                    match_id,
+                    god_name,
+                    won,
+                    enemy_gods,
+                    self.checkpointer.match_time(),
+                )
+                apply_match(self.data, record)
+                self.new_matches.append(record)
+                self.checkpointer.add(record)
+                self.output["gods_completed"] += 1
+
+            if next_url is None:
+                self.output["god_count"] = self.output["gods_completed"]
+                self.output["messages"].append(("Done scraping!", "normal"))
+                return seen
+            url = next_url
+            try:
+                html = self.get_page(url)
+            except OSError as error:
+                self.stop_early(error)
+                return seen
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class MatchRecord:
+    match_id: str
+    god_name: str
+    won: bool
+    enemy_gods: list[str]
+    # Unix time an update scraped the match at, as close to when it was
+    # played as the match pages get. 0 when that says nothing, for a first
+    # scrape and for matches logged before timestamps were.
+    played_at: float = 0.0
+
+    def to_line(self) -> str:
+        fields = [
+            self.match_id,
+            self.god_name,
+            "W" if self.won else "L",
+            ",".join(self.enemy_gods),
+        ]
+        if self.played_at:
+            fields.append(f"{self.played_at:.0f}")
+        return "\t".join(fields)
+
+    @classmethod
+    def from_line(cls, line: str) -> MatchRecord | None:
+        fields = line.split("\t")
+        if len(fields) not in (4, 5) or fields[2] not in ("W", "L"):
+            return None
+        match_id, god_name, result, enemy_gods = fields[:4]
+        try:
+            played_at = float(fields[4]) if len(fields) == 5 else 0.0
+        except ValueError:
+            return None
+        return cls(
+            match_id,
+            god_name,
+            result == "W",
+            enemy_gods.split(",") if enemy_gods else [],
+            played_at,
+        )
+
+
+class MatchLog:
+    # One line per scraped match, only ever appended to. A snapshot of the
+    # aggregated data remembers how far into the log it goes, so loading is
+    # the snapshot plus whatever was logged after it.
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        # Just past the last complete line read, where to pick up next time
+        self.position = 0
+
+    @staticmethod
+    def path_for(data_filepath: str) -> str:
+        return os.path.splitext(data_filepath)[0] + ".log"
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.filepath)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, records: Iterable[MatchRecord]) -> None:
+        lines = [record.to_line() + "\n" for record in records]
+        if not lines:
+            return
+
+        with open(self.filepath, "a+b") as log_file:
+            # A crash mid-write can leave a partial last line, cut it off so
+            # the new records don't complete it into a bogus one
+            log_file.truncate(self.complete_size(log_file))
+            log_file.write("".join(lines).encode("utf-8"))
+            log_file.flush()
+            os.fsync(log_file.fileno())
+
+    @staticmethod
+    def complete_size(log_file) -> int:
+        end = log_file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            block = min(4096, position)
+            position -= block
+            log_file.seek(position)
+            newline = log_file.read(block).rfind(b"\n")
+            if newline != -1:
+                return position + newline + 1
+        return 0
+
+    def read(self, start: int = 0) -> Iterator[MatchRecord]:
+        self.position = start
+        try:
+            log_file = open(self.filepath, "rb")
+        except FileNotFoundError:
+            return
+
+        with log_file:
+            log_file.seek(start)
+            for line in log_file:
+                # A line still being written is read again once it's done
+                if not line.endswith(b"\n"):
+                    break
+                self.position += len(line)
+                record = MatchRecord.from_line(line[:-1].decode("utf-8"))
+                if record is not None:
+                    yield record
@@ -0,0 +1,154 @@
+import os
+import struct
+from collections.abc import Iterator, Mapping
+
+import numpy as np
+
+from .matchups import MatchupView, god_stats
+
+# A matchup store is a read-only binary copy of a player's data that can be
+# memory mapped instead of unpickled:
+#
+#   header   magic, version, name count, god count, size of the name table
+#   names    UTF-8 names joined by newlines, padded to a multiple of 8 bytes
+#   totals   int32 [god count, 2], total wins and losses of the gods
+#   counts   int32 [name count, name count, 2], wins and losses per matchup
+#
+# The first god count names are the gods of the data, in order, the rest are
+# enemies that only show up in matchups.
+STORE_MAGIC = b"SGPM"
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct("<4sIIII")
+
+
+def matchup_store_path(data_filepath: str) -> str:
+    return os.path.splitext(data_filepath)[0] + ".matchups"
+
+
+def write_matchup_store(data: Mapping, filepath: str) -> None:
+    tables = {id(god_data.table): god_data.table for god_data in data.values()}
+    if len(tables) != 1:
+        raise ValueError("Every god has to share one MatchupTable")
+    table = next(iter(tables.values()))
+
+    names = list(data)
+    names += [name for name in table.names if name not in data]
+    table_ids = np.array([table.ids[name] for name in names], dtype=np.int64)
+    name_table = "\n".join(names).encode("utf-8")
+    padding = -(STORE_HEADER.size + len(name_table)) % 8
+
+    totals = np.array(
+        [[god_data.total_wins, god_data.total_losses] for god_data in data.values()],
+        dtype="<i4",
+    ).reshape(len(data), 2)
+    counts = table.counts[np.ix_(table_ids, table_ids)].astype("<i4")
+
+    # Write next to the old store and swap it in, so readers never see a
+    # half written file
+    temp_filepath = filepath + ".tmp"
+    with open(temp_filepath, "wb") as store_file:
+        store_file.write(
+            STORE_HEADER.pack(
+                STORE_MAGIC, STORE_VERSION, len(names), len(data), len(name_table)
+            )
+        )
+        store_file.write(name_table + b"\0" * padding)
+        store_file.write(totals.tobytes())
+        store_file.write(counts.tobytes())
+    os.replace(temp_filepath, filepath)
+
+
+class StoredGodData:
+    # Read-only stand in for GodData, backed by a MatchupStore
+    __slots__ = ("god_name", "table", "row", "total_wins", "total_losses")
+
+    def __init__(self, store: "MatchupStore", row: int):
+        self.god_name = store.names[row]
+        self.table = store
+        self.row = row
+        self.total_wins = int(store.totals[row, 0])
+        self.total_losses = int(store.totals[row, 1])
+
+    @property
+    def matchups(self) -> MatchupView:
+        return MatchupView(self.table, self.row)
+
+    @property
+    def win_rate(self) -> float:
+        return god_stats(self.total_wins, self.total_losses)[0]
+
+    @property
+    def value(self) -> float:
+        return god_stats(self.total_wins, self.total_losses)[1]
+
+    def __lt__(self, other) -> bool:
+        return self.value < other.value
+
+    def __gt__(self, other) -> bool:
+        return self.value > other.value
+
+
+class MatchupStore(Mapping):
+    # Maps god names to StoredGodData like the dict of GodData it was written
+    # from. The arrays are memory mapped, so opening a store only reads the
+    # header and names, and processes opening the same store share pages.
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        with open(filepath, "rb") as store_file:
+            header = store_file.read(STORE_HEADER.size)
+            if len(header) < STORE_HEADER.size:
+                raise ValueError(f"{filepath} is not a matchup store")
+            magic, version, name_count, god_count, names_size = STORE_HEADER.unpack(
+                header
+            )
+            if magic != STORE_MAGIC:
+                raise ValueError(f"{filepath} is not a matchup store")
+            if version != STORE_VERSION:
+                raise ValueError(
+                    f"{filepath} has matchup store version {version}, "
+                    f"expected {STORE_VERSION}"
+                )
+            name_table = store_file.read(names_size).decode("utf-8")
+
+        self.names: list[str] = name_table.split("\n") if name_count else []
+        self.ids: dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.god_count = god_count
+
+        offset = STORE_HEADER.size + names_size
+        offset += -offset % 8
+        self.totals = np.memmap(
+            filepath, dtype="<i4", mode="r", offset=offset, shape=(god_count, 2)
+        )
+        offset += self.totals.nbytes
+        self.counts = np.memmap(
+            filepath,
+            dtype="<i4",
+            mode="r",
+            offset=offset,
+            shape=(name_count, name_count, 2),
+        )
+
+    def god_values(self) -> np.ndarray:
+        return np.array(
+            [god_stats(int(wins), int(losses))[1] for wins, losses in self.totals],
+            dtype=float,
+        )
+
+    def __getitem__(self, god_name: str) -> StoredGodData:
+        row = self.ids.get(god_name, self.god_count)
+        if row >= self.god_count:
+            raise KeyError(god_name)
+        return StoredGodData(self, row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names[: self.god_count])
+
+    def __len__(self) -> int:
+        return self.god_count
+
+    def __getstate__(self) -> str:
+        # Other processes map the file again instead of getting a copy
+        return self.filepath
+
+    def __setstate__(self, filepath: str) -> None:
+        self.__init__(filepath)
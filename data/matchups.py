@@ -0,0 +1,104 @@
+from collections.abc import Iterator, Mapping
+
+import numpy as np
+
+
+def god_stats(total_wins: int, total_losses: int) -> tuple[float, float]:
+    # (win rate, value) of a god from its totals
+    total = total_wins + total_losses
+    win_rate = 0 if total == 0 else total_wins / total
+
+    x = min(total, 100)
+    if x == 0:
+        value = 0
+    else:
+        value = 10 / 7 * x ** 0.5 + win_rate * 10
+        # value = win_rate * min(total_wins, 100)
+
+    return win_rate, value
+
+
+class MatchupTable:
+    # Wins and losses of every god against every other god for one player,
+    # counts[god id, enemy id] = (wins, losses). Names are interned to ids
+    # once and the array grows by doubling when a new name shows up. Counts
+    # can also be floats, for weighted stats.
+    __slots__ = ("ids", "names", "counts")
+
+    def __init__(self, capacity: int = 128, dtype=np.int32):
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self.counts = np.zeros((capacity, capacity, 2), dtype=dtype)
+
+    def intern(self, name: str) -> int:
+        if name in self.ids:
+            return self.ids[name]
+
+        god_id = len(self.names)
+        if god_id == self.counts.shape[0]:
+            counts = np.zeros((2 * god_id, 2 * god_id, 2), dtype=self.counts.dtype)
+            counts[:god_id, :god_id] = self.counts
+            self.counts = counts
+
+        self.ids[name] = god_id
+        self.names.append(name)
+        return god_id
+
+    def __getstate__(self) -> tuple[list[str], np.ndarray]:
+        # Most counts are small, so save them in the smallest type that fits
+        size = len(self.names)
+        counts = self.counts[:size, :size]
+        if counts.dtype.kind == "f":
+            return self.names, counts
+        dtype = np.min_scalar_type(int(counts.max()) if counts.size else 0)
+        return self.names, counts.astype(dtype)
+
+    def __setstate__(self, state: tuple[list[str], np.ndarray]) -> None:
+        self.names, counts = state
+        self.ids = {name: god_id for god_id, name in enumerate(self.names)}
+        capacity = max(128, len(self.names))
+        dtype = counts.dtype if counts.dtype.kind == "f" else np.int32
+        self.counts = np.zeros((capacity, capacity, 2), dtype=dtype)
+        self.counts[: len(self.names), : len(self.names)] = counts
+
+
+class MatchupView(Mapping):
+    # Dict-like view of one god's row in a MatchupTable. Like the defaultdict
+    # it replaces, looking up a god you've never played against gives
+    # (0, 0) instead of raising, but unlike it that doesn't add an entry.
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: MatchupTable, row: int):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, god: str) -> np.ndarray:
+        if god not in self.table.ids:
+            return np.zeros(2, dtype=np.int32)
+        return self.table.counts[self.row, self.table.ids[god]]
+
+    def get(self, god: str, default=None):
+        if god not in self:
+            return default
+        return self[god]
+
+    def __contains__(self, god: object) -> bool:
+        return god in self.table.ids and bool(
+            self.table.counts[self.row, self.table.ids[god]].any()
+        )
+
+    def played(self) -> np.ndarray:
+        size = len(self.table.names)
+        return np.flatnonzero(self.table.counts[self.row, :size].any(axis=1))
+
+    def __iter__(self) -> Iterator[str]:
+        for god_id in self.played():
+            yield self.table.names[god_id]
+
+    def __len__(self) -> int:
+        return len(self.played())
+
+    def __repr__(self) -> str:
+        return repr(
+            {god: [int(wins), int(losses)] for god, (wins, losses) in self.items()}
+        )
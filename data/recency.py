@@ -0,0 +1,235 @@
+import bisect
+import time
+from collections import Counter
+from collections.abc import Iterable
+
+import numpy as np
+
+from .match_log import MatchLog, MatchRecord
+from .matchups import MatchupTable
+from .scrape import GodData
+
+DAY = 24 * 60 * 60
+
+
+class RecencyStats:
+    # Matchup stats where recent matches count for more, built from the
+    # timestamps in the match log. The match pages don't show when a match
+    # was played, so a timestamp is when it was scraped, and only matches
+    # found by an update get one. Everything else, a first scrape and data
+    # from before timestamps, is older than any of those, so it's decayed
+    # like the earliest timestamped match and counts in full in every window.
+    #
+    # Every match adds 2 ** ((played_at - reference) / half_life) to its
+    # counts, so the decayed counts at any time are the stored counts times
+    # one factor and adding a match is O(enemies). The undecayed counts are
+    # kept too, they're what data has beyond the untimed rest. For windows
+    # the matches are also counted per day, so a window only sums the days
+    # in it, or the ones outside it if there are fewer.
+    def __init__(self, half_life_days: float = 30.0):
+        self.half_life = half_life_days * DAY
+        self.reference: float | None = None
+        self.earliest: float | None = None
+
+        self.table = MatchupTable(dtype=np.float64)
+        size = self.table.counts.shape[0]
+        self.totals = np.zeros((size, 2))
+        self.logged_totals = np.zeros((size, 2))
+        self.logged_counts = np.zeros((size, size, 2))
+
+        # days[day][(row, column, result)] counts the matches of that day,
+        # column -1 being the totals. day_list has the days in order.
+        self.days: dict[int, Counter] = {}
+        self.day_list: list[int] = []
+
+        self.log_position = 0
+        self.weighted: dict[tuple, dict[str, GodData]] = {}
+
+    def grow(self) -> None:
+        size = self.table.counts.shape[0]
+        old_size = self.totals.shape[0]
+        if old_size == size:
+            return
+        for name in ("totals", "logged_totals"):
+            grown = np.zeros((size, 2))
+            grown[:old_size] = getattr(self, name)
+            setattr(self, name, grown)
+        logged_counts = np.zeros((size, size, 2))
+        logged_counts[:old_size, :old_size] = self.logged_counts
+        self.logged_counts = logged_counts
+
+    def add(self, record: MatchRecord) -> None:
+        if not record.played_at:
+            return
+
+        if self.reference is None:
+            self.reference = record.played_at
+        exponent = (record.played_at - self.reference) / self.half_life
+        if exponent > 512:
+            # Move the reference forward before the weights overflow
+            self.rebase(record.played_at)
+            exponent = 0
+        weight = 2.0**exponent
+        if self.earliest is None or record.played_at < self.earliest:
+            self.earliest = record.played_at
+
+        row = self.table.intern(record.god_name)
+        columns = [self.table.intern(enemy) for enemy in record.enemy_gods]
+        self.grow()
+
+        day = int(record.played_at // DAY)
+        if day not in self.days:
+            self.days[day] = Counter()
+            bisect.insort(self.day_list, day)
+        bucket = self.days[day]
+
+        # Column 0 holds wins and column 1 losses
+        result = 0 if record.won else 1
+        self.totals[row, result] += weight
+        self.logged_totals[row, result] += 1
+        bucket[row, -1, result] += 1
+        for column in columns:
+            self.table.counts[row, column, result] += weight
+            self.logged_counts[row, column, result] += 1
+            bucket[row, column, result] += 1
+
+        self.weighted.clear()
+
+    def update(self, records: Iterable[MatchRecord]) -> None:
+        for record in records:
+            self.add(record)
+
+    def update_from_log(self, log: MatchLog) -> None:
+        # The log is only appended to, so only read what's new since last time.
+        # The scraper can be appending while this reads, so continue from
+        # where reading stopped rather than from the size it had before.
+        if log.size() < self.log_position:
+            self.__init__(self.half_life / DAY)
+        for record in log.read(self.log_position):
+            self.add(record)
+        self.log_position = log.position
+
+    def rebase(self, reference: float) -> None:
+        scale = 2.0 ** ((self.reference - reference) / self.half_life)
+        self.table.counts *= scale
+        self.totals *= scale
+        self.reference = reference
+
+    def scale(self, now: float) -> float:
+        if self.reference is None:
+            return 0.0
+        return 2.0 ** ((self.reference - now) / self.half_life)
+
+    def decayed_rate(self, god: str, enemy: str) -> float:
+        # Decay weighted win rate of god against enemy, 0.5 if never played.
+        # Every count shares the same factor, so it doesn't depend on when
+        # you ask.
+        if god not in self.table.ids or enemy not in self.table.ids:
+            return 0.5
+        wins, losses = self.table.counts[self.table.ids[god], self.table.ids[enemy]]
+        return 0.5 if wins + losses == 0 else wins / (wins + losses)
+
+    def sum_days(self, days: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        size = self.table.counts.shape[0]
+        totals = np.zeros((size, 2))
+        counts = np.zeros((size, size, 2))
+        keys = [key for day in days for key in self.days[day]]
+        if not keys:
+            return totals, counts
+
+        rows, columns, results = np.array(keys, dtype=np.int64).T
+        amounts = np.array(
+            [amount for day in days for amount in self.days[day].values()],
+            dtype=np.float64,
+        )
+        is_total = columns < 0
+        np.add.at(totals, (rows[is_total], results[is_total]), amounts[is_total])
+        is_pair = ~is_total
+        np.add.at(
+            counts,
+            (rows[is_pair], columns[is_pair], results[is_pair]),
+            amounts[is_pair],
+        )
+        return totals, counts
+
+    def window_counts(
+        self, window_days: float, now: float | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # (totals, counts) of the matches played in the last window_days, by
+        # whole days, so the day the window starts in counts in full
+        now = time.time() if now is None else now
+        first_day = int((now - window_days * DAY) // DAY)
+        start = bisect.bisect_left(self.day_list, first_day)
+        end = bisect.bisect_right(self.day_list, int(now // DAY))
+
+        inside = self.day_list[start:end]
+        outside = self.day_list[:start] + self.day_list[end:]
+        if len(inside) <= len(outside):
+            return self.sum_days(inside)
+        totals, counts = self.sum_days(outside)
+        return self.logged_totals - totals, self.logged_counts - counts
+
+    def weighted_data(
+        self,
+        data: dict[str, GodData],
+        window_days: float | None = None,
+        now: float | None = None,
+    ) -> dict[str, GodData]:
+        # A copy of data with decay weighted counts, or only the matches of
+        # the last window_days. It's computed once an hour, or once a match
+        # is added, so a GodPicker can keep using the same one. Only the
+        # cache goes by the hour, the window runs up to now, so a match
+        # scraped a second ago is in it.
+        if now is None:
+            now = time.time()
+        key = (tuple(data), window_days, now // 3600 * 3600)
+        if key in self.weighted:
+            return self.weighted[key]
+
+        if window_days is None:
+            scale = self.scale(now)
+            totals = self.totals * scale
+            counts = self.table.counts * scale
+            if self.earliest is None:
+                untimed_weight = 1.0
+            else:
+                untimed_weight = 2.0 ** ((self.earliest - now) / self.half_life)
+        else:
+            totals, counts = self.window_counts(window_days, now)
+            untimed_weight = 1.0
+
+        size = len(self.table.names)
+        table = MatchupTable(max(128, size), dtype=np.float64)
+        for name in self.table.names:
+            table.intern(name)
+        table.counts[:size, :size] = counts[:size, :size]
+
+        # Whatever data has beyond the timestamped matches is the untimed rest
+        weighted = {}
+        for god_name, source in data.items():
+            god_data = GodData(god_name, table)
+            untimed = np.array(
+                [source.total_wins, source.total_losses], dtype=np.float64
+            )
+            god_id = self.table.ids.get(god_name)
+            if god_id is not None:
+                untimed -= self.logged_totals[god_id]
+            wins, losses = np.maximum(untimed, 0.0) * untimed_weight
+            if god_id is not None:
+                wins += totals[god_id, 0]
+                losses += totals[god_id, 1]
+            god_data.total_wins = float(wins)
+            god_data.total_losses = float(losses)
+
+            for enemy, (enemy_wins, enemy_losses) in source.matchups.items():
+                untimed = np.array([enemy_wins, enemy_losses], dtype=np.float64)
+                enemy_id = self.table.ids.get(enemy)
+                if god_id is not None and enemy_id is not None:
+                    untimed -= self.logged_counts[god_id, enemy_id]
+                untimed = np.maximum(untimed, 0.0) * untimed_weight
+                if untimed.any():
+                    table.counts[god_data.row, table.intern(enemy)] += untimed
+            weighted[god_name] = god_data
+
+        self.weighted = {key: weighted}
+        return weighted
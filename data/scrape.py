@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import os
 import pickle
-from collections import defaultdict
+import queue
+import sys
+import threading
+import time
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from subprocess import CREATE_NO_WINDOW
+from typing import TYPE_CHECKING
 
 from selenium.common.exceptions import (
     ElementClickInterceptedException,
@@ -17,45 +23,106 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from .checkpoint import Checkpointer
+from .dataset_cache import DatasetCache
+from .match_log import MatchLog, MatchRecord
+from .matchup_store import MatchupStore, matchup_store_path, write_matchup_store
+from .matchups import MatchupTable, MatchupView, god_stats
+from .seen_index import SeenIndex
 
-@dataclass
+if TYPE_CHECKING:
+    from .sqlite_store import SQLiteStore
+
+
+@dataclass(slots=True)
 class GodData:
     god_name: str
-    matchups: dict[str, list[int, int]] = field(init=False)
+    # Matchup counts live in a MatchupTable shared by all the GodData of a
+    # player, so give every god of a dataset the same table
+    table: MatchupTable = field(default=None, repr=False, compare=False)
+    row: int = field(init=False, repr=False, compare=False)
     total_wins: int = field(init=False, default=0)
     total_losses: int = field(init=False, default=0)
+    # Derived stats are cached until the next win or loss
+    stats: dict[str, float] | None = field(
+        init=False, default=None, repr=False, compare=False
+    )
 
     def __post_init__(self):
-        self.matchups = defaultdict(self.default_value)
+        if self.table is None:
+            self.table = MatchupTable()
+        self.row = self.table.intern(self.god_name)
+
+    @property
+    def matchups(self) -> MatchupView:
+        return MatchupView(self.table, self.row)
 
     def win_against(self, gods: list[str]) -> None:
         self.total_wins += 1
         for god in gods:
-            self.matchups[god][0] += 1
+            self.table.counts[self.row, self.table.intern(god), 0] += 1
+        self.stats = None
 
     def lose_against(self, gods: list[str]) -> None:
         self.total_losses += 1
         for god in gods:
-            self.matchups[god][1] += 1
+            self.table.counts[self.row, self.table.intern(god), 1] += 1
+        self.stats = None
 
     def default_value(self) -> tuple[int, int]:
+        # Only kept so GodData pickled with a defaultdict of matchups can be
+        # loaded, as those pickles refer to it
         return [0, 0]
 
+    def update_stats(self) -> None:
+        win_rate, value = god_stats(self.total_wins, self.total_losses)
+        self.stats = {"win_rate": win_rate, "value": value}
+
+    def finalize(self) -> None:
+        # Matchup rates are computed by MatchupMatrix, only the totals are
+        # worth caching here
+        if self.stats is None:
+            self.update_stats()
+
     @property
     def win_rate(self) -> float:
-        if self.total_wins + self.total_losses == 0:
-            return 0
-
-        return self.total_wins / (self.total_wins + self.total_losses)
+        if self.stats is None:
+            self.update_stats()
+        return self.stats["win_rate"]
 
     @property
     def value(self) -> float:
-        x = min(self.total_wins + self.total_losses, 100)
-        if x == 0:
-            return 0
+        if self.stats is None:
+            self.update_stats()
+        return self.stats["value"]
+
+    def __getstate__(self) -> dict:
+        # The caches are cheap to rebuild, so keep them out of the save files
+        return {
+            "god_name": self.god_name,
+            "table": self.table,
+            "total_wins": self.total_wins,
+            "total_losses": self.total_losses,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        # Totals that were still 0 can be missing from older pickles
+        self.god_name = state["god_name"]
+        self.total_wins = state.get("total_wins", 0)
+        self.total_losses = state.get("total_losses", 0)
+        self.stats = None
+
+        if "table" in state:
+            self.table = state["table"]
+            self.row = self.table.intern(self.god_name)
+            return
 
-        return 10 / 7 * x ** 0.5 + self.win_rate * 10
-        # return self.win_rate * min(self.total_wins, 100)
+        # GodData saved before the shared table kept its own defaultdict of
+        # matchups. Give it a table of its own, share_table merges them.
+        self.table = MatchupTable()
+        self.row = self.table.intern(self.god_name)
+        for god, (wins, losses) in state["matchups"].items():
+            self.table.counts[self.row, self.table.intern(god)] = (wins, losses)
 
     def __lt__(self, other) -> bool:
         return self.value < other.value
@@ -64,15 +131,176 @@ class GodData:
         return self.value > other.value
 
 
+def create_data(god_names: Iterable[str]) -> dict[str, GodData]:
+    table = MatchupTable()
+    return {god: GodData(god, table) for god in god_names}
+
+
+def add_god(data: dict[str, GodData], god_name: str) -> GodData:
+    table = next(iter(data.values())).table if data else None
+    data[god_name] = GodData(god_name, table)
+    return data[god_name]
+
+
+def share_table(data: dict[str, GodData]) -> MatchupTable:
+    # Move every god of data onto one MatchupTable, if they don't already
+    # share one
+    tables = {id(god_data.table): god_data.table for god_data in data.values()}
+    if len(tables) == 1:
+        return next(iter(tables.values()))
+
+    table = MatchupTable()
+    for god_data in data.values():
+        table.intern(god_data.god_name)
+    for god_data in data.values():
+        old_table, old_row = god_data.table, god_data.row
+        god_data.table = table
+        god_data.row = table.ids[god_data.god_name]
+        for god_id in MatchupView(old_table, old_row).played():
+            enemy = table.intern(old_table.names[god_id])
+            table.counts[god_data.row, enemy] = old_table.counts[old_row, god_id]
+    return table
+
+
+def apply_match(data: dict[str, GodData], record: MatchRecord) -> None:
+    if record.god_name not in data:
+        add_god(data, record.god_name)
+
+    if record.won:
+        data[record.god_name].win_against(record.enemy_gods)
+    else:
+        data[record.god_name].lose_against(record.enemy_gods)
+
+
+# What reading a partially written or otherwise damaged pickle raises
+SNAPSHOT_ERRORS = (EOFError, pickle.UnpicklingError)
+
+
+def snapshot_backup_path(filepath: str) -> str:
+    return filepath + ".bak"
+
+
+def write_snapshot(
+    data: dict[str, GodData], seen: SeenIndex, log_position: int, filepath: str
+) -> None:
+    # Write the new snapshot to a temp file first and keep the old one as a
+    # backup, so there's always a complete snapshot on disk
+    temp_filepath = filepath + ".tmp"
+    with open(temp_filepath, "wb") as data_file:
+        pickle.dump([data, seen, log_position], data_file)
+        data_file.flush()
+        os.fsync(data_file.fileno())
+    if os.path.exists(filepath):
+        os.replace(filepath, snapshot_backup_path(filepath))
+    os.replace(temp_filepath, filepath)
+
+
+def read_snapshot(filepath: str) -> tuple[dict[str, GodData], SeenIndex, int]:
+    # Falls back to the previous snapshot if the latest one is missing or
+    # damaged, replaying the match log from there catches it back up
+    error = None
+    for path in (filepath, snapshot_backup_path(filepath)):
+        try:
+            with open(path, "rb") as data_file:
+                snapshot = pickle.load(data_file)
+            break
+        except FileNotFoundError:
+            continue
+        except SNAPSHOT_ERRORS as e:
+            error = error or e
+    else:
+        if error is not None:
+            raise error
+        raise FileNotFoundError(filepath)
+
+    # Snapshots saved before the match log are just [data, seen]
+    data, seen = snapshot[:2]
+    log_position = snapshot[2] if len(snapshot) > 2 else 0
+    share_table(data)
+    if not isinstance(seen, SeenIndex):
+        seen = SeenIndex(seen)
+    return data, seen, log_position
+
+
+def replay_log(
+    data: dict[str, GodData], seen: SeenIndex, filepath: str, log_position: int = 0
+) -> int:
+    replayed = 0
+    for record in MatchLog(MatchLog.path_for(filepath)).read(log_position):
+        if record.match_id in seen:
+            continue
+        apply_match(data, record)
+        seen.add(record.match_id)
+        replayed += 1
+    return replayed
+
+
+def load_data(filepath: str) -> tuple[dict[str, GodData], SeenIndex]:
+    data, seen, log_position = read_snapshot(filepath)
+    replay_log(data, seen, filepath, log_position)
+    return data, seen
+
+
+def finalize_data(data: dict[str, GodData]) -> None:
+    for god_data in data.values():
+        god_data.finalize()
+
+
+# Roughly what one headless Chrome needs while clicking through match pages
+BROWSER_MEMORY = 400 * 1024 * 1024
+
+
+def available_memory() -> int | None:
+    if sys.platform == "win32":
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+        return None
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def max_browser_workers(requested: int) -> int:
+    # Every worker is its own browser, so don't start more than there are
+    # cores or memory for
+    workers = min(requested, os.cpu_count() or 1)
+    memory = available_memory()
+    if memory is not None:
+        workers = min(workers, memory // BROWSER_MEMORY)
+    return max(1, workers)
+
+
 class APIScraperBot:
     def __init__(
         self,
         path_to_driver: str,
         show_window: bool = True,
         screen_size: tuple[int, int] = (800, 600),
+        sqlite_store: SQLiteStore | None = None,
+        dataset_cache: DatasetCache | None = None,
+        browser_workers: int = 1,
     ):
         self.options = Options()
         self.path_to_driver = path_to_driver
+        self.screen_size = screen_size
         if not show_window:
             self.options.add_argument("--headless")
         self.options.add_argument(f"--window-size={screen_size[0]},{screen_size[1]}")
@@ -89,6 +317,32 @@ class APIScraperBot:
         self.MATCH_ID_CLASS = "match-id"
         self.NEXT_PAGE_CLASS = "next-btn"
         self.PREV_PAGE_CLASS = "prev-btn"
+        # The history page the browser is on, see move_page
+        self.history_page = 0
+
+        # Scraped matches are appended to a match log next to the data file,
+        # and the data file itself is only rewritten as a snapshot once this
+        # many matches have been logged since the last one
+        self.SNAPSHOT_EVERY = 500
+        self.matches_since_snapshot = 0
+        self.new_matches: list[MatchRecord] = []
+        self.checkpointer: Checkpointer | None = None
+        self.scrape_finished = True
+
+        # With a SQLiteStore every player's matches go to one database instead
+        # of a pickle and match log per player
+        self.sqlite_store = sqlite_store
+
+        # Datasets already loaded this session, the app reads it too
+        self.dataset_cache = dataset_cache or DatasetCache()
+
+        # More than one scrapes the history pages with that many browsers at
+        # once, see get_matches_parallel
+        self.browser_workers = browser_workers
+        self.free_page = 0
+        self.stop_page: int | None = None
+        self.last_page: int | None = None
+        self.page_lock = threading.Lock()
 
     def create_driver(self):
         chrome_service = ChromeService(self.path_to_driver)
@@ -98,124 +352,267 @@ class APIScraperBot:
             chrome_options=self.options,
         )
 
-    def load_previous_data(self, filepath: str) -> tuple[dict[str, GodData], set[str]]:
+    @staticmethod
+    def player_key(filepath: str) -> str:
+        return os.path.splitext(os.path.basename(filepath))[0]
+
+    def data_sources(self, filepath: str) -> list[str]:
+        # The files a player's data is loaded from
+        if self.sqlite_store is not None:
+            return [self.sqlite_store.filepath]
+        return [filepath, MatchLog.path_for(filepath)]
+
+    def get_cached_data(self, filepath: str):
+        return self.dataset_cache.get(filepath, self.data_sources(filepath))
+
+    def load_previous_data(self, filepath: str) -> tuple[dict[str, GodData], SeenIndex]:
+        if self.sqlite_store is not None:
+            return self.load_previous_database_data(filepath)
+
         try:
-            with open(filepath, "rb") as data_file:
-                self.output["messages"].append(("Loaded previous data", "normal"))
-                data, prev_seen = pickle.load(data_file)
-                return data, prev_seen
-        except FileNotFoundError:
-            self.output["messages"].append(("Creating default data", "normal"))
-            data = {}
+            data, prev_seen, log_position = read_snapshot(filepath)
+            self.output["messages"].append(("Loaded previous data", "normal"))
+            created = False
+        except (FileNotFoundError, *SNAPSHOT_ERRORS) as e:
+            if isinstance(e, FileNotFoundError):
+                self.output["messages"].append(("Creating default data", "normal"))
+            else:
+                # Keep the damaged files around instead of overwriting them
+                for path in (filepath, snapshot_backup_path(filepath)):
+                    if os.path.exists(path):
+                        os.replace(path, path + ".corrupt")
+                self.output["messages"].append(
+                    (f"Couldn't read {filepath}, rebuilding it from the log", "warning")
+                )
             with open("files/all_gods.txt") as f:
-                for god in f:
-                    god = god.strip()
-                    data[god] = GodData(god)
+                data = create_data(god.strip() for god in f)
+
+            prev_seen = SeenIndex()
+            log_position = 0
+            created = True
+
+        self.matches_since_snapshot = replay_log(
+            data, prev_seen, filepath, log_position
+        )
+        if self.matches_since_snapshot:
+            self.output["messages"].append(
+                (f"Replayed {self.matches_since_snapshot} logged matches", "normal")
+            )
 
-            prev_seen = set()
+        if created:
             self.save_data(data, prev_seen, filepath)
-            return data, prev_seen
+        return data, prev_seen
+
+    def load_previous_database_data(
+        self, filepath: str
+    ) -> tuple[dict[str, GodData], SeenIndex]:
+        player = self.player_key(filepath)
+        with open("files/all_gods.txt") as f:
+            god_names = [god.strip() for god in f]
+
+        if self.sqlite_store.has_player(player):
+            self.output["messages"].append(("Loaded previous data", "normal"))
+            return self.sqlite_store.load_data([player], god_names)
+
+        try:
+            # Move data saved before the database over to it
+            data, prev_seen = load_data(filepath)
+            self.output["messages"].append(
+                (f"Imported previous data from {filepath}", "normal")
+            )
+        except FileNotFoundError:
+            self.output["messages"].append(("Creating default data", "normal"))
+            data = create_data(god_names)
+            prev_seen = SeenIndex()
+
+        self.save_data(data, prev_seen, filepath)
+        return data, prev_seen
 
     def save_data(
-        self, data: dict[str, GodData], seen: set[str], filepath: str
+        self, data: dict[str, GodData], seen: SeenIndex, filepath: str
     ) -> None:
-        with open(filepath, "wb") as data_file:
-            pickle.dump([data, seen], data_file)
+        if self.sqlite_store is not None:
+            self.sqlite_store.save_data(data, seen, self.player_key(filepath))
+            return
 
-    def find_last_page(self) -> int:
-        self.output["messages"].append(
-            ("Finding out how many pages of data to process", "normal")
-        )
-        self.output["messages"].append(
-            ("Finding out how many matches to process", "normal")
-        )
-        page = 0
-        gods = 0
-        while True:
-            recent_matches_container = WebDriverWait(
-                self.driver, self.PAGE_LOAD_WAIT_TIME
-            ).until(EC.presence_of_element_located((By.XPATH, self.RECENT_GAMES_XPATH)))
-            containers = WebDriverWait(
-                recent_matches_container, self.PAGE_LOAD_WAIT_TIME
-            ).until(
-                EC.presence_of_all_elements_located(
-                    (By.CLASS_NAME, "ind-match-container")
-                )
+        # data has to include everything in the match log at this point
+        log_position = MatchLog(MatchLog.path_for(filepath)).size()
+        write_snapshot(data, seen, log_position, filepath)
+        self.matches_since_snapshot = 0
+
+    def open_matchup_store(self, filepath: str) -> MatchupStore | None:
+        # Only use the store if it's at least as new as the data it mirrors
+        store_filepath = matchup_store_path(filepath)
+        try:
+            store_time = os.path.getmtime(store_filepath)
+        except FileNotFoundError:
+            return None
+        for source in self.data_sources(filepath):
+            if os.path.exists(source) and os.path.getmtime(source) > store_time:
+                return None
+
+        try:
+            return MatchupStore(store_filepath)
+        except (OSError, ValueError):
+            return None
+
+    def save_matchup_store(self, data: dict[str, GodData], filepath: str) -> None:
+        try:
+            write_matchup_store(data, matchup_store_path(filepath))
+        except OSError:
+            # On Windows the old store can't be replaced while it's mapped,
+            # it'll just be stale until the next save
+            self.output["messages"].append(
+                ("Couldn't update the matchup store", "warning")
             )
 
-            gods += len(containers)
+    def save_matches(self, records: list[MatchRecord], filepath: str) -> None:
+        if self.sqlite_store is not None:
+            # The database is always up to date, so it never needs a snapshot
+            self.sqlite_store.save_matches(records, self.player_key(filepath))
+            return
 
-            try:
-                WebDriverWait(self.driver, self.NEXT_LOAD_WAIT_TIME).until(
-                    EC.presence_of_element_located(
-                        (By.CLASS_NAME, self.NEXT_PAGE_CLASS)
-                    )
-                )
-            except TimeoutException:
-                self.output["god_count"] = gods
-                self.output["messages"].append(
-                    (f"Found {page} pages of data with {gods} matches", "normal")
-                )
-                return page
+        MatchLog(MatchLog.path_for(filepath)).append(records)
+        self.matches_since_snapshot += len(records)
 
-            next_button = self.driver.find_element(By.CLASS_NAME, self.NEXT_PAGE_CLASS)
-            actions = ActionChains(self.driver)
-            actions.move_to_element(next_button).perform()
-            next_button = self.driver.find_element(By.CLASS_NAME, self.NEXT_PAGE_CLASS)
-            next_button.click()
-            page += 1
+    def open_profile(self, smitesource_url: str) -> bool:
+        self.driver = self.create_driver()
+        self.driver.get(smitesource_url)
+        self.history_page = 0
+        try:
+            WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
+                EC.presence_of_element_located((By.XPATH, self.IMG_AVATAR_XPATH))
+            )
+        except TimeoutException:
+            return False
+        return True
+
+    def has_prev_page(self) -> bool:
+        try:
+            WebDriverWait(self.driver, self.PREV_LOAD_WAIT_TIME).until(
+                EC.presence_of_element_located((By.CLASS_NAME, self.PREV_PAGE_CLASS))
+            )
+        except TimeoutException:
+            return False
+        return True
+
+    def has_next_page(self) -> bool:
+        try:
+            WebDriverWait(self.driver, self.NEXT_LOAD_WAIT_TIME).until(
+                EC.presence_of_element_located((By.CLASS_NAME, self.NEXT_PAGE_CLASS))
+            )
+        except TimeoutException:
+            return False
+        return True
+
+    def click_page_button(self, button_class: str) -> None:
+        button = self.driver.find_element(By.CLASS_NAME, button_class)
+        actions = ActionChains(self.driver)
+        actions.move_to_element(button).perform()
+        button = self.driver.find_element(By.CLASS_NAME, button_class)
+        button.click()
+        # time.sleep(0.1)
+
+        WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
+            EC.presence_of_element_located((By.XPATH, self.RECENT_GAMES_XPATH))
+        )
 
     def move_page(self, page: int) -> bool:
+        # history_page is the page the history was on when we last left it.
+        # Coming back from a match it either still shows that page or starts
+        # over at the first one, which has no prev button, so one check tells
+        # which and only the difference has to be clicked through.
         WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
             EC.presence_of_element_located((By.XPATH, self.RECENT_GAMES_XPATH))
         )
+        if self.history_page and not self.has_prev_page():
+            self.history_page = 0
 
-        while True:
-            try:
-                WebDriverWait(self.driver, self.PREV_LOAD_WAIT_TIME).until(
-                    EC.presence_of_element_located(
-                        (By.CLASS_NAME, self.PREV_PAGE_CLASS)
-                    )
-                )
-                prev_button = self.driver.find_element(
-                    By.CLASS_NAME, self.PREV_PAGE_CLASS
-                )
-                prev_button.click()
-                WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
-                    EC.presence_of_element_located((By.XPATH, self.RECENT_GAMES_XPATH))
-                )
-            except TimeoutException:
-                break
+        while self.history_page > page:
+            self.click_page_button(self.PREV_PAGE_CLASS)
+            self.history_page -= 1
 
-        for _ in range(page):
-            try:
-                WebDriverWait(self.driver, self.NEXT_LOAD_WAIT_TIME).until(
-                    EC.presence_of_element_located(
-                        (By.CLASS_NAME, self.NEXT_PAGE_CLASS)
-                    )
-                )
-            except TimeoutException:
+        while self.history_page < page:
+            if not self.has_next_page():
                 return False
 
-            next_button = self.driver.find_element(By.CLASS_NAME, self.NEXT_PAGE_CLASS)
-            actions = ActionChains(self.driver)
-            actions.move_to_element(next_button).perform()
-            next_button = self.driver.find_element(By.CLASS_NAME, self.NEXT_PAGE_CLASS)
-            next_button.click()
-            # time.sleep(0.1)
+            self.click_page_button(self.NEXT_PAGE_CLASS)
+            self.history_page += 1
 
-            WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
-                EC.presence_of_element_located((By.XPATH, self.RECENT_GAMES_XPATH))
-            )
+        return True
+
+    def open_match(self, match_container) -> bool:
+        WebDriverWait(match_container, self.PAGE_LOAD_WAIT_TIME).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "nav-to-match"))
+        )
+
+        nav_to_match = match_container.find_element(By.CLASS_NAME, "nav-to-match")
+
+        WebDriverWait(nav_to_match, self.PAGE_LOAD_WAIT_TIME).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "alt--text"))
+        )
 
+        view_match_button = nav_to_match.find_element(By.CLASS_NAME, "alt--text")
+
+        try:
+            actions = ActionChains(self.driver)
+            actions.move_to_element(view_match_button).perform()
+            view_match_button = nav_to_match.find_element(By.CLASS_NAME, "alt--text")
+            view_match_button.click()
+        except ElementClickInterceptedException:
+            self.output["messages"].append(
+                ("Stop moving your mouse please :c", "error")
+            )
+            return False
         return True
 
-    def get_matches(self, prev_seen: set[str]) -> set[str]:
-        last_page = self.find_last_page()
+    def read_match_id(self) -> str:
+        WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
+            EC.presence_of_element_located((By.CLASS_NAME, self.MATCH_ID_CLASS))
+        )
+
+        while True:
+            match_id = self.driver.find_element(By.CLASS_NAME, self.MATCH_ID_CLASS).text
+            if match_id:
+                return match_id
+
+    def read_enemy_gods(self, loss: bool) -> list[str]:
+        team_one_container = WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
+            EC.presence_of_all_elements_located((By.CLASS_NAME, "team-one-container"))
+        )[1]
+
+        temp_text = team_one_container.find_element(By.CLASS_NAME, "match-result").text
+        if (temp_text == "Winning Team" and loss) or (
+            temp_text == "Losing Team" and not loss
+        ):
+            enemy_container = team_one_container
+        else:
+            enemy_container = WebDriverWait(
+                self.driver, self.PAGE_LOAD_WAIT_TIME
+            ).until(
+                EC.presence_of_all_elements_located(
+                    (By.CLASS_NAME, "team-two-container")
+                )
+            )[1]
+
+        enemy_gods = []
+        for enemy in enemy_container.find_elements(By.CLASS_NAME, "player-container"):
+            enemy_gods.append(enemy.find_element(By.CLASS_NAME, "god-name").text)
+        return enemy_gods
+
+    def get_matches(self, prev_seen: SeenIndex) -> set[str]:
+        # Goes through the history newest first and stops at the first match
+        # we already have, so an update only loads the pages with new matches.
+        # How many pages there are isn't known up front, so god_count is an
+        # estimate that grows as pages turn up: the matches on the pages so
+        # far, plus a page's worth while there's a next page.
         new_page = True
+        has_next = True
         seen = set()
 
         current_page = 0
+        counted_page = -1
+        matches_found = 0
         self.output["gods_completed"] = 0
 
         while new_page:
@@ -231,6 +628,14 @@ class APIScraperBot:
                     By.CLASS_NAME, "ind-match-container"
                 )
 
+                if counted_page < current_page:
+                    counted_page = current_page
+                    matches_found += len(containers)
+                    has_next = self.has_next_page()
+                    self.output["god_count"] = matches_found + (
+                        len(containers) if has_next else 0
+                    )
+
                 if index >= len(containers):
                     break
 
@@ -238,47 +643,24 @@ class APIScraperBot:
                 loss = "loss" in data.get_attribute("class")
                 god_name = data.find_element(By.CLASS_NAME, "god-name").text
 
-                WebDriverWait(data, self.PAGE_LOAD_WAIT_TIME).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "nav-to-match"))
-                )
-
-                nav_to_match = data.find_element(By.CLASS_NAME, "nav-to-match")
-
-                WebDriverWait(nav_to_match, self.PAGE_LOAD_WAIT_TIME).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "alt--text"))
-                )
-
-                view_match_button = nav_to_match.find_element(
-                    By.CLASS_NAME, "alt--text"
-                )
-
-                try:
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(view_match_button).perform()
-                    view_match_button = nav_to_match.find_element(
-                        By.CLASS_NAME, "alt--text"
-                    )
-                    view_match_button.click()
-                except ElementClickInterceptedException:
-                    self.output["messages"].append(
-                        ("Stop moving your mouse please :c", "error")
-                    )
+                if not self.open_match(data):
                     continue
-
-                WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, self.MATCH_ID_CLASS))
-                )
-
-                while True:
-                    match_id = self.driver.find_element(
-                        By.CLASS_NAME, self.MATCH_ID_CLASS
-                    ).text
-                    if match_id:
-                        break
+                match_id = self.read_match_id()
 
                 if match_id in prev_seen:
+                    if not self.checkpointer.stops_at(match_id):
+                        # Already scraped by a scrape that didn't finish
+                        self.driver.back()
+                        index += 1
+                        WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
+                            EC.presence_of_element_located(
+                                (By.XPATH, self.RECENT_GAMES_XPATH)
+                            )
+                        )
+                        continue
                     self.output["messages"].append((f"Found old {match_id}", "normal"))
                     self.output["messages"].append(("Stopping scrape", "normal"))
+                    self.output["god_count"] = self.output["gods_completed"]
                     self.driver.quit()
                     return seen
 
@@ -299,50 +681,16 @@ class APIScraperBot:
                     )
                     seen.add(match_id)
 
-                    team_one_container = WebDriverWait(
-                        self.driver, self.PAGE_LOAD_WAIT_TIME
-                    ).until(
-                        EC.presence_of_all_elements_located(
-                            (By.CLASS_NAME, "team-one-container")
-                        )
-                    )[
-                        1
-                    ]
-
-                    temp_text = team_one_container.find_element(
-                        By.CLASS_NAME, "match-result"
-                    ).text
-                    if (temp_text == "Winning Team" and loss) or (
-                        temp_text == "Losing Team" and not loss
-                    ):
-                        enemy_container = team_one_container
-                    else:
-                        enemy_container = WebDriverWait(
-                            self.driver, self.PAGE_LOAD_WAIT_TIME
-                        ).until(
-                            EC.presence_of_all_elements_located(
-                                (By.CLASS_NAME, "team-two-container")
-                            )
-                        )[
-                            1
-                        ]
-
-                    enemy_gods = []
-                    for enemy in enemy_container.find_elements(
-                        By.CLASS_NAME, "player-container"
-                    ):
-                        enemy_god_name = enemy.find_element(
-                            By.CLASS_NAME, "god-name"
-                        ).text
-                        enemy_gods.append(enemy_god_name)
-
-                    if god_name not in self.data:
-                        self.data[god_name] = GodData(god_name)
-
-                    if loss:
-                        self.data[god_name].lose_against(enemy_gods)
-                    else:
-                        self.data[god_name].win_against(enemy_gods)
+                    record = MatchRecord(
+                        match_id,
+                        god_name,
+                        not loss,
+                        self.read_enemy_gods(loss),
+                        self.checkpointer.match_time(),
+                    )
+                    apply_match(self.data, record)
+                    self.new_matches.append(record)
+                    self.checkpointer.add(record)
                 else:
                     if not new_page:
                         self.output["messages"].append(("Done scraping!", "normal"))
@@ -361,7 +709,8 @@ class APIScraperBot:
                 )
 
             current_page += 1
-            if current_page > last_page:
+            if not has_next:
+                self.output["god_count"] = self.output["gods_completed"]
                 self.output["messages"].append(("Done scraping!", "normal"))
                 break
 
@@ -369,6 +718,240 @@ class APIScraperBot:
 
         return seen
 
+    def found_old(self, page: int) -> None:
+        # Pages are newest first, so nothing after page is new either
+        with self.page_lock:
+            if self.stop_page is None or page < self.stop_page:
+                self.stop_page = page
+
+    def found_end(self, page: int) -> None:
+        # page is the last page of the history
+        with self.page_lock:
+            if self.last_page is None or page < self.last_page:
+                self.last_page = page
+        self.found_old(page)
+
+    def stopped_before(self, page: int) -> bool:
+        with self.page_lock:
+            return self.stop_page is not None and self.stop_page < page
+
+    def take_page(self) -> int | None:
+        # The next history page no worker has taken yet, or None once the
+        # scrape doesn't need any more
+        with self.page_lock:
+            page = self.free_page
+            if self.stop_page is not None and self.stop_page < page:
+                return None
+            self.free_page += 1
+            return page
+
+    def scrape_page(
+        self,
+        page: int,
+        prev_seen: SeenIndex,
+        records: queue.Queue,
+        coordinator: APIScraperBot,
+    ) -> None:
+        # Reads one history page for a worker of get_matches_parallel and
+        # puts (page, entries) on records once the whole page is read. The
+        # entries are a MatchRecord for every new match and the id of every
+        # match we already have, in page order, so the coordinator can tell
+        # where the scrape ends. A page the coordinator stopped before is
+        # dropped, and so is one past the end of the history, which tells the
+        # coordinator where the end is.
+        entries = []
+        index = 0
+        while not coordinator.stopped_before(page):
+            if not self.move_page(page):
+                # The history ends before page, the worker of the last page
+                # reports exactly where
+                coordinator.found_end(page - 1)
+                return
+
+            recent_matches_container = self.driver.find_element(
+                By.XPATH, self.RECENT_GAMES_XPATH
+            )
+            containers = recent_matches_container.find_elements(
+                By.CLASS_NAME, "ind-match-container"
+            )
+            if index >= len(containers):
+                if not self.has_next_page():
+                    coordinator.found_end(page)
+                records.put((page, entries))
+                return
+
+            data = containers[index]
+            loss = "loss" in data.get_attribute("class")
+            god_name = data.find_element(By.CLASS_NAME, "god-name").text
+
+            if not self.open_match(data):
+                continue
+            match_id = self.read_match_id()
+
+            if match_id in prev_seen:
+                entries.append(match_id)
+                if coordinator.checkpointer.marker is None:
+                    # Without a marker every seen match ends the scrape
+                    coordinator.found_old(page)
+                    self.driver.back()
+                    records.put((page, entries))
+                    return
+            else:
+                # The coordinator times it, see Checkpointer.match_time
+                entries.append(
+                    MatchRecord(
+                        match_id, god_name, not loss, self.read_enemy_gods(loss)
+                    )
+                )
+
+            self.driver.back()
+            index += 1
+            WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
+                EC.presence_of_element_located((By.XPATH, self.RECENT_GAMES_XPATH))
+            )
+
+    def create_worker(self) -> APIScraperBot:
+        worker = APIScraperBot(self.path_to_driver, False, self.screen_size)
+        worker.output = self.output
+        return worker
+
+    def run_worker(
+        self,
+        worker: APIScraperBot,
+        prev_seen: SeenIndex,
+        records: queue.Queue,
+    ) -> None:
+        page = None
+        try:
+            if worker.driver is None and not worker.open_profile(self.smitesource_url):
+                # The other workers take the pages it would have
+                self.output["messages"].append(
+                    ("A browser worker couldn't open the profile", "warning")
+                )
+                return
+            while True:
+                page = self.take_page()
+                if page is None:
+                    break
+                worker.scrape_page(page, prev_seen, records, self)
+        except Exception as error:
+            records.put((page, error))
+        finally:
+            if worker.driver is not None:
+                worker.driver.quit()
+            # Tells the writer this worker is done
+            records.put(None)
+
+    def get_matches_parallel(self, prev_seen: SeenIndex, workers: int) -> set[str]:
+        # Every worker takes the next history page nobody has yet, scrapes it
+        # in its own browser and puts it on a queue, until a page shows there
+        # are no more, either because it has a match we already have or
+        # because it's the last one. How many pages there are is never
+        # counted up front. The browser that opened the profile is one of the
+        # workers.
+        #
+        # Only this thread takes pages off the queue, and it applies them in
+        # page order, so the data, the seen ids and the checkpointer have a
+        # single writer and what's saved is always the history up to some
+        # match, like a scrape with one browser would save. Pages that come
+        # in early wait for the ones before them, and if one never comes,
+        # because a worker failed, the scrape ends before it.
+        self.output["messages"].append((f"Scraping with {workers} browsers", "normal"))
+        self.free_page = 0
+        self.stop_page = None
+        self.last_page = None
+        records: queue.Queue = queue.Queue()
+        threads = [
+            threading.Thread(
+                target=self.run_worker,
+                args=(worker, prev_seen, records),
+                daemon=True,
+            )
+            for worker in [self] + [self.create_worker() for _ in range(workers - 1)]
+        ]
+        for thread in threads:
+            thread.start()
+
+        seen = set()
+        error = None
+        stopped = False
+        pages: dict[int, list] = {}
+        next_page = 0
+        matches_found = 0
+        self.output["gods_completed"] = 0
+        running = workers
+        while running:
+            item = records.get()
+            if item is None:
+                running -= 1
+                continue
+            page, entries = item
+            if isinstance(entries, Exception):
+                error = error or entries
+                if page is not None:
+                    # Everything before the page still gets finished and applied
+                    self.found_old(page - 1)
+                continue
+            pages[page] = entries
+
+            # Like get_matches, the matches on the pages so far plus a page's
+            # worth while the end hasn't turned up
+            matches_found += len(entries)
+            self.output["god_count"] = matches_found + (
+                len(entries) if self.last_page is None else 0
+            )
+
+            while not stopped and next_page in pages:
+                for entry in pages.pop(next_page):
+                    if isinstance(entry, str):
+                        if self.checkpointer.stops_at(entry):
+                            self.output["messages"].append(
+                                (f"Found old {entry}", "normal")
+                            )
+                            self.found_old(next_page)
+                            stopped = True
+                            break
+                        continue
+                    if entry.match_id in seen:
+                        continue
+
+                    self.output["messages"].append(
+                        (f"New match found: {entry.match_id}", "normal")
+                    )
+                    self.output["messages"].append(
+                        (
+                            f"You {'won' if entry.won else 'lost'} as "
+                            f"{entry.god_name}",
+                            "normal" if entry.won else "error",
+                        )
+                    )
+                    seen.add(entry.match_id)
+                    entry.played_at = self.checkpointer.match_time()
+                    apply_match(self.data, entry)
+                    self.new_matches.append(entry)
+                    self.checkpointer.add(entry)
+                    self.output["gods_completed"] += 1
+                next_page += 1
+
+        for thread in threads:
+            thread.join()
+        if error is not None:
+            raise error
+
+        self.output["god_count"] = self.output["gods_completed"]
+        if stopped:
+            self.output["messages"].append(("Stopping scrape", "normal"))
+        elif self.last_page is not None and next_page > self.last_page:
+            self.output["messages"].append(("Done scraping!", "normal"))
+        else:
+            # A worker gave up, what's before its pages is saved and the
+            # next scrape picks up from there
+            self.scrape_finished = False
+            self.output["messages"].append(
+                (f"Stopped scraping at page {next_page}", "warning")
+            )
+        return seen
+
     def get_player_data(
         self,
         smitesource_url: str,
@@ -378,24 +961,36 @@ class APIScraperBot:
     ) -> None:
         self.output = output
         self.output["messages"] = []
+        self.smitesource_url = smitesource_url
+
+        if not update_data:
+            data = self.get_cached_data(filepath)
+            if data is not None:
+                self.output["messages"].append(("Loaded cached data", "normal"))
+                self.output["data"] = data
+                self.output["messages"].append(("Done scraping!", "normal"))
+                return
+
+            store = self.open_matchup_store(filepath)
+            if store is not None:
+                self.dataset_cache.put(filepath, self.data_sources(filepath), store)
+                self.output["messages"].append(("Loaded matchup store", "normal"))
+                self.output["data"] = store
+                self.output["messages"].append(("Done scraping!", "normal"))
+                return
+
         self.data, prev_seen = self.load_previous_data(filepath)
+        finalize_data(self.data)
 
         if not update_data:
+            self.save_matchup_store(self.data, filepath)
+            self.dataset_cache.put(filepath, self.data_sources(filepath), self.data)
             self.output["data"] = self.data
             self.output["messages"].append(("Done scraping!", "normal"))
             return
 
-        self.driver = self.create_driver()
-        self.driver.get(smitesource_url)
         self.output["messages"].append(("Looking for smitesource profile", "normal"))
-
-        try:
-            WebDriverWait(self.driver, self.PAGE_LOAD_WAIT_TIME).until(
-                EC.presence_of_element_located((By.XPATH, self.IMG_AVATAR_XPATH))
-            )
-            self.output["messages"].append(("Found smitesource profile", "normal"))
-
-        except TimeoutException:
+        if not self.open_profile(smitesource_url):
             self.output["messages"].append(
                 ("Couldn't find smitesource profile", "error")
             )
@@ -403,9 +998,36 @@ class APIScraperBot:
                 ("Make sure you don't have a private profile", "warning")
             )
             return
+        self.output["messages"].append(("Found smitesource profile", "normal"))
 
-        new_seen = self.get_matches(prev_seen)
-        self.save_data(self.data, prev_seen | new_seen, filepath)
-        self.output["messages"].append((f"Saved data to {filepath}", "normal"))
+        self.new_matches = []
+        self.checkpointer = Checkpointer(self, filepath, prev_seen)
+        if self.checkpointer.marker is not None:
+            self.output["messages"].append(
+                ("Picking up where the last scrape stopped", "normal")
+            )
+        finished = False
+        try:
+            # get_matches_parallel clears it when it couldn't get to the end
+            self.scrape_finished = True
+            workers = max_browser_workers(self.browser_workers)
+            if workers > 1:
+                new_seen = self.get_matches_parallel(prev_seen, workers)
+            else:
+                new_seen = self.get_matches(prev_seen)
+            finished = self.scrape_finished
+        finally:
+            # Also saves what was scraped before an error, and keeps the
+            # resume marker unless the scrape got to its end
+            self.checkpointer.close(finished)
+        finalize_data(self.data)
+        self.output["messages"].append(
+            (f"Logged {len(self.new_matches)} new matches", "normal")
+        )
+        if self.matches_since_snapshot >= self.SNAPSHOT_EVERY:
+            self.save_data(self.data, prev_seen | new_seen, filepath)
+            self.output["messages"].append((f"Saved data to {filepath}", "normal"))
+        self.save_matchup_store(self.data, filepath)
+        self.dataset_cache.put(filepath, self.data_sources(filepath), self.data)
 
         self.output["data"] = self.data
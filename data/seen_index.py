@@ -0,0 +1,112 @@
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+
+class SeenIndex:
+    # Set of seen match ids. Smite match ids are numbers, so they're kept in a
+    # sorted int64 array and looked up with a binary search, which takes a
+    # fraction of the memory of a set of strings. New ids go to a small
+    # pending set that's merged into the array once it grows, and anything
+    # that isn't a number is kept as a string.
+    __slots__ = ("ids", "pending", "other")
+
+    MERGE_EVERY = 1024
+
+    def __init__(self, match_ids: Iterable[str] = ()):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.pending: set[int] = set()
+        self.other: set[str] = set()
+        self.update(match_ids)
+
+    @staticmethod
+    def to_number(match_id: str) -> int | None:
+        # Only ids that turn back into the exact same string can be numbers
+        if match_id.isascii() and match_id.isdigit() and match_id == str(int(match_id)):
+            number = int(match_id)
+            if number < 2**63:
+                return number
+        return None
+
+    def add(self, match_id: str) -> None:
+        number = self.to_number(match_id)
+        if number is None:
+            self.other.add(match_id)
+            return
+
+        if not self.contains_number(number):
+            self.pending.add(number)
+            if len(self.pending) >= self.MERGE_EVERY:
+                self.merge()
+
+    def update(self, match_ids: Iterable[str]) -> None:
+        numbers = []
+        for match_id in match_ids:
+            number = self.to_number(match_id)
+            if number is None:
+                self.other.add(match_id)
+            else:
+                numbers.append(number)
+
+        if numbers:
+            self.merge()
+            self.ids = np.union1d(self.ids, np.array(numbers, dtype=np.int64))
+
+    def merge(self) -> None:
+        if self.pending:
+            pending = np.fromiter(self.pending, dtype=np.int64, count=len(self.pending))
+            self.ids = np.union1d(self.ids, pending)
+            self.pending.clear()
+
+    def contains_number(self, number: int) -> bool:
+        if number in self.pending:
+            return True
+        position = np.searchsorted(self.ids, number)
+        return position < len(self.ids) and self.ids[position] == number
+
+    def __contains__(self, match_id: object) -> bool:
+        if not isinstance(match_id, str):
+            return False
+        number = self.to_number(match_id)
+        if number is None:
+            return match_id in self.other
+        return self.contains_number(number)
+
+    def __iter__(self) -> Iterator[str]:
+        self.merge()
+        for number in self.ids:
+            yield str(number)
+        yield from self.other
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.pending) + len(self.other)
+
+    def __or__(self, match_ids: Iterable[str]) -> "SeenIndex":
+        union = SeenIndex()
+        self.merge()
+        union.ids = self.ids.copy()
+        union.other = set(self.other)
+        union.update(match_ids)
+        return union
+
+    def __repr__(self) -> str:
+        return f"SeenIndex({len(self)} matches)"
+
+    def __getstate__(self) -> tuple[int | None, np.ndarray, set[str]]:
+        # Ids are close together, so save the first one and the gaps between
+        # them in the smallest type that fits
+        self.merge()
+        if not len(self.ids):
+            return None, np.empty(0, dtype=np.uint8), self.other
+        gaps = np.diff(self.ids)
+        dtype = np.min_scalar_type(int(gaps.max()) if gaps.size else 0)
+        return int(self.ids[0]), gaps.astype(dtype), self.other
+
+    def __setstate__(self, state: tuple[int | None, np.ndarray, set[str]]) -> None:
+        first, gaps, self.other = state
+        self.pending = set()
+        self.ids = np.empty(len(gaps) + (first is not None), dtype=np.int64)
+        if first is not None:
+            self.ids[0] = first
+            np.cumsum(gaps, dtype=np.int64, out=self.ids[1:])
+            self.ids[1:] += first
@@ -0,0 +1,263 @@
+import sqlite3
+from collections.abc import Iterable
+
+from .match_log import MatchRecord
+from .scrape import GodData, create_data
+from .seen_index import SeenIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    match_id TEXT NOT NULL,
+    god_name TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    PRIMARY KEY (player_id, match_id)
+);
+
+CREATE TABLE IF NOT EXISTS participants (
+    player_id INTEGER NOT NULL,
+    match_id TEXT NOT NULL,
+    enemy_god TEXT NOT NULL,
+    FOREIGN KEY (player_id, match_id) REFERENCES matches (player_id, match_id)
+);
+
+CREATE TABLE IF NOT EXISTS seen_matches (
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    match_id TEXT NOT NULL,
+    PRIMARY KEY (player_id, match_id)
+);
+
+-- Totals brought in from pickled data, which has no per match history
+CREATE TABLE IF NOT EXISTS imported_totals (
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    god_name TEXT NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    PRIMARY KEY (player_id, god_name)
+);
+
+CREATE TABLE IF NOT EXISTS imported_matchups (
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    god_name TEXT NOT NULL,
+    enemy_god TEXT NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    PRIMARY KEY (player_id, god_name, enemy_god)
+);
+
+CREATE INDEX IF NOT EXISTS matches_god ON matches (player_id, god_name);
+CREATE INDEX IF NOT EXISTS participants_match ON participants (player_id, match_id);
+CREATE INDEX IF NOT EXISTS participants_enemy ON participants (enemy_god);
+
+CREATE VIEW IF NOT EXISTS god_totals AS
+SELECT player_id, god_name, SUM(wins) AS wins, SUM(losses) AS losses
+FROM (
+    SELECT player_id, god_name, won AS wins, 1 - won AS losses FROM matches
+    UNION ALL
+    SELECT player_id, god_name, wins, losses FROM imported_totals
+)
+GROUP BY player_id, god_name;
+
+CREATE VIEW IF NOT EXISTS matchup_totals AS
+SELECT player_id, god_name, enemy_god, SUM(wins) AS wins, SUM(losses) AS losses
+FROM (
+    SELECT m.player_id, m.god_name, p.enemy_god, m.won AS wins, 1 - m.won AS losses
+    FROM matches AS m
+    JOIN participants AS p USING (player_id, match_id)
+    UNION ALL
+    SELECT player_id, god_name, enemy_god, wins, losses FROM imported_matchups
+)
+GROUP BY player_id, god_name, enemy_god;
+"""
+
+
+class SQLiteStore:
+    # One database for every player. Scraped matches are stored one row per
+    # match, with the enemy gods in participants, and the god_totals and
+    # matchup_totals views aggregate them for any set of players.
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.connection = sqlite3.connect(filepath, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def player_id(self, player: str) -> int:
+        self.connection.execute(
+            "INSERT OR IGNORE INTO players (name) VALUES (?)", (player,)
+        )
+        return self.connection.execute(
+            "SELECT id FROM players WHERE name = ?", (player,)
+        ).fetchone()[0]
+
+    def has_player(self, player: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM players WHERE name = ?", (player,)
+            ).fetchone()
+            is not None
+        )
+
+    def players(self) -> list[str]:
+        return [
+            name
+            for name, in self.connection.execute("SELECT name FROM players ORDER BY id")
+        ]
+
+    def player_filter(self, players: Iterable[str] | None) -> tuple[str, list]:
+        if players is None:
+            return "", []
+        players = list(players)
+        placeholders = ", ".join("?" * len(players))
+        return (
+            "WHERE player_id IN "
+            f"(SELECT id FROM players WHERE name IN ({placeholders}))",
+            players,
+        )
+
+    def god_totals(
+        self, players: Iterable[str] | None = None
+    ) -> dict[str, tuple[int, int]]:
+        where, parameters = self.player_filter(players)
+        return {
+            god_name: (wins, losses)
+            for god_name, wins, losses in self.connection.execute(
+                f"SELECT god_name, SUM(wins), SUM(losses) FROM god_totals {where} "
+                "GROUP BY god_name",
+                parameters,
+            )
+        }
+
+    def matchup_totals(
+        self, players: Iterable[str] | None = None
+    ) -> list[tuple[str, str, int, int]]:
+        where, parameters = self.player_filter(players)
+        return self.connection.execute(
+            "SELECT god_name, enemy_god, SUM(wins), SUM(losses) FROM matchup_totals "
+            f"{where} GROUP BY god_name, enemy_god",
+            parameters,
+        ).fetchall()
+
+    def seen(self, players: Iterable[str] | None = None) -> SeenIndex:
+        where, parameters = self.player_filter(players)
+        return SeenIndex(
+            match_id
+            for match_id, in self.connection.execute(
+                f"SELECT match_id FROM seen_matches {where}", parameters
+            )
+        )
+
+    def load_data(
+        self, players: Iterable[str] | None = None, god_names: Iterable[str] = ()
+    ) -> tuple[dict[str, GodData], SeenIndex]:
+        # Pass None for every player in the database
+        if players is not None:
+            players = list(players)
+
+        totals = self.god_totals(players)
+        data = create_data(dict.fromkeys([*god_names, *totals]))
+        for god_name, (wins, losses) in totals.items():
+            data[god_name].total_wins = wins
+            data[god_name].total_losses = losses
+
+        table = next(iter(data.values())).table if data else None
+        for god_name, enemy_god, wins, losses in self.matchup_totals(players):
+            if god_name not in data:
+                continue
+            table.counts[data[god_name].row, table.intern(enemy_god)] = (wins, losses)
+
+        return data, self.seen(players)
+
+    def save_matches(self, records: list[MatchRecord], player: str) -> None:
+        # One transaction per scrape
+        with self.connection:
+            player_id = self.player_id(player)
+            # Matches saved before are ignored, and so must their enemies be,
+            # or the matchups would count them twice
+            participants = []
+            for record in records:
+                cursor = self.connection.execute(
+                    "INSERT OR IGNORE INTO matches "
+                    "(player_id, match_id, god_name, won) VALUES (?, ?, ?, ?)",
+                    (player_id, record.match_id, record.god_name, int(record.won)),
+                )
+                if cursor.rowcount:
+                    participants.extend(
+                        (player_id, record.match_id, enemy_god)
+                        for enemy_god in record.enemy_gods
+                    )
+            self.connection.executemany(
+                "INSERT INTO participants (player_id, match_id, enemy_god) "
+                "VALUES (?, ?, ?)",
+                participants,
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO seen_matches (player_id, match_id) "
+                "VALUES (?, ?)",
+                [(player_id, record.match_id) for record in records],
+            )
+
+    def save_data(self, data: dict[str, GodData], seen: SeenIndex, player: str) -> None:
+        # Whatever in data isn't backed by match rows, like data that came
+        # from a pickle, is kept as imported totals
+        with self.connection:
+            player_id = self.player_id(player)
+            self.connection.execute(
+                "DELETE FROM imported_totals WHERE player_id = ?", (player_id,)
+            )
+            self.connection.execute(
+                "DELETE FROM imported_matchups WHERE player_id = ?", (player_id,)
+            )
+
+            totals = self.god_totals([player])
+            self.connection.executemany(
+                "INSERT INTO imported_totals VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        player_id,
+                        god_name,
+                        god_data.total_wins - totals.get(god_name, (0, 0))[0],
+                        god_data.total_losses - totals.get(god_name, (0, 0))[1],
+                    )
+                    for god_name, god_data in data.items()
+                    if (god_data.total_wins, god_data.total_losses)
+                    != totals.get(god_name, (0, 0))
+                ],
+            )
+
+            matchups = {
+                (god_name, enemy_god): (wins, losses)
+                for god_name, enemy_god, wins, losses in self.matchup_totals([player])
+            }
+            imported = []
+            for god_name, god_data in data.items():
+                for enemy_god, (wins, losses) in god_data.matchups.items():
+                    logged_wins, logged_losses = matchups.get(
+                        (god_name, enemy_god), (0, 0)
+                    )
+                    if (wins, losses) != (logged_wins, logged_losses):
+                        imported.append(
+                            (
+                                player_id,
+                                god_name,
+                                enemy_god,
+                                int(wins) - logged_wins,
+                                int(losses) - logged_losses,
+                            )
+                        )
+            self.connection.executemany(
+                "INSERT INTO imported_matchups VALUES (?, ?, ?, ?, ?)", imported
+            )
+
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO seen_matches (player_id, match_id) "
+                "VALUES (?, ?)",
+                [(player_id, match_id) for match_id in seen],
+            )
@@ -0,0 +1,17 @@
+import os
+import subprocess
+
+import pytest
+
+# The app runs on Windows, and data.scrape hides chromedriver's console with
+# a flag only Windows has. Nothing here starts a browser.
+if not hasattr(subprocess, "CREATE_NO_WINDOW"):
+    subprocess.CREATE_NO_WINDOW = 0
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def in_repo(monkeypatch):
+    # New data is created from files/all_gods.txt
+    monkeypatch.chdir(ROOT)
@@ -0,0 +1,138 @@
+import threading
+import time
+
+from data import APIScraperBot, MatchRecord
+
+PAGE_SIZE = 10
+GODS = ["Agni", "Ares", "Athena", "Bacchus", "Chronos"]
+
+
+class Crash(Exception):
+    pass
+
+
+def make_history(prefix: str, count: int) -> list[MatchRecord]:
+    # Newest first, like the site shows it
+    return [
+        MatchRecord(
+            f"{prefix}{i}",
+            GODS[i % len(GODS)],
+            i % 3 != 0,
+            [GODS[(i + 1) % len(GODS)], GODS[(i + 2) % len(GODS)]],
+        )
+        for i in range(count)
+    ]
+
+
+class Text:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class MatchContainer:
+    def __init__(self, record: MatchRecord):
+        self.record = record
+
+    def get_attribute(self, name: str) -> str:
+        return "ind-match-container" + ("" if self.record.won else " loss")
+
+    def find_element(self, by, value) -> Text:
+        return Text(self.record.god_name)
+
+
+class RecentGames:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def find_elements(self, by, value) -> list[MatchContainer]:
+        page = self.driver.page
+        history = self.driver.site.history
+        return [
+            MatchContainer(record)
+            for record in history[page * PAGE_SIZE : (page + 1) * PAGE_SIZE]
+        ]
+
+
+class FakeDriver:
+    # Only what the scraper asks a driver for between the steps FakeSite
+    # replaces. Real WebDriverWaits poll find_element, which always finds.
+    def __init__(self, site):
+        self.site = site
+        self.page = 0
+        self.match = None
+
+    def find_element(self, by, value) -> RecentGames:
+        return RecentGames(self)
+
+    def back(self) -> None:
+        self.match = None
+
+    def quit(self) -> None:
+        pass
+
+
+class FakeSite:
+    # A smitesource match history in memory. install() swaps the browser
+    # steps of APIScraperBot for ones that read it, so get_player_data runs
+    # everything else for real, checkpointing and browser workers included.
+    def __init__(self, history: list[MatchRecord]):
+        self.history = history
+        self.crash_at: str | None = None
+        # Seconds reading a match of a page takes, to finish pages out of order
+        self.page_delays: dict[int, float] = {}
+        self.pages_visited: set[int] = set()
+        self.lock = threading.Lock()
+
+    def page_count(self) -> int:
+        return max(1, -(-len(self.history) // PAGE_SIZE))
+
+    def install(self, monkeypatch) -> None:
+        site = self
+
+        def open_profile(self, smitesource_url: str) -> bool:
+            self.driver = FakeDriver(site)
+            self.history_page = 0
+            return True
+
+        def move_page(self, page: int) -> bool:
+            if page >= site.page_count():
+                self.history_page = self.driver.page = site.page_count() - 1
+                return False
+            with site.lock:
+                site.pages_visited.add(page)
+            self.history_page = self.driver.page = page
+            return True
+
+        def has_next_page(self) -> bool:
+            return self.driver.page + 1 < site.page_count()
+
+        def open_match(self, match_container: MatchContainer) -> bool:
+            time.sleep(site.page_delays.get(self.driver.page, 0))
+            self.driver.match = match_container.record
+            return True
+
+        def read_match_id(self) -> str:
+            return self.driver.match.match_id
+
+        def read_enemy_gods(self, loss: bool) -> list[str]:
+            if self.driver.match.match_id == site.crash_at:
+                raise Crash(site.crash_at)
+            return list(self.driver.match.enemy_gods)
+
+        for step in (
+            open_profile,
+            move_page,
+            has_next_page,
+            open_match,
+            read_match_id,
+            read_enemy_gods,
+        ):
+            monkeypatch.setattr(APIScraperBot, step.__name__, step)
+        # Every worker asked for gets a browser, whatever memory there is
+        monkeypatch.setattr("data.scrape.max_browser_workers", lambda workers: workers)
+
+    def scrape(self, filepath: str, workers: int = 1) -> dict:
+        output = {}
+        bot = APIScraperBot("", browser_workers=workers)
+        bot.get_player_data("https://smitesource.com/player/Tester-1", filepath, output)
+        return output
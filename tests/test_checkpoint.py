@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from data import (
+    APIScraperBot,
+    Checkpointer,
+    MatchLog,
+    MatchRecord,
+    SeenIndex,
+    create_data,
+    read_resume_marker,
+    write_resume_marker,
+)
+
+
+@pytest.fixture
+def bot():
+    bot = APIScraperBot("")
+    bot.output = {"messages": []}
+    bot.data = create_data(["Agni", "Ares"])
+    return bot
+
+
+def record(match_id):
+    return MatchRecord(match_id, "Agni", True, ["Ares"])
+
+
+def test_without_a_marker_the_first_seen_match_stops(bot, tmp_path):
+    checkpointer = Checkpointer(bot, str(tmp_path / "Tester.pkl"), SeenIndex(["1"]))
+    assert checkpointer.stops_at("1")
+    checkpointer.close(True)
+
+
+def test_seen_matches_up_to_the_marker_are_skipped(bot, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    write_resume_marker(filepath, {"match_id": "2", "timed": False})
+    checkpointer = Checkpointer(bot, filepath, SeenIndex(["1", "2", "3"]))
+    assert not checkpointer.stops_at("1")
+    assert not checkpointer.stops_at("2")
+    assert checkpointer.stops_at("3")
+    checkpointer.close(True)
+
+
+def test_only_updates_are_timestamped(bot, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    first_scrape = Checkpointer(bot, filepath, SeenIndex())
+    assert first_scrape.match_time() == 0.0
+    first_scrape.close(True)
+
+    update = Checkpointer(bot, filepath, SeenIndex(["1"]))
+    assert update.match_time() == pytest.approx(time.time(), abs=5)
+    update.close(True)
+
+    # Resuming a first scrape, what's newer than the marker came in since
+    write_resume_marker(filepath, {"match_id": "1", "timed": False})
+    resumed = Checkpointer(bot, filepath, SeenIndex(["1"]))
+    assert resumed.match_time() > 0
+    resumed.stops_at("1")
+    assert resumed.match_time() == 0.0
+    resumed.close(True)
+
+
+def test_marker_follows_the_log_until_the_scrape_finishes(bot, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    checkpointer = Checkpointer(bot, filepath, SeenIndex())
+    for match_id in ("3", "2", "1"):
+        checkpointer.add(record(match_id))
+    checkpointer.close(False)
+    assert read_resume_marker(filepath) == {"match_id": "1", "timed": False}
+    logged = MatchLog(MatchLog.path_for(filepath)).read()
+    assert [record.match_id for record in logged] == ["3", "2", "1"]
+
+    checkpointer = Checkpointer(bot, filepath, SeenIndex(["3", "2", "1"]))
+    checkpointer.close(True)
+    assert read_resume_marker(filepath) is None
+
+
+def test_failed_checkpoints_are_saved_with_the_next_one(bot, tmp_path, monkeypatch):
+    filepath = str(tmp_path / "Tester.pkl")
+    save_matches = APIScraperBot.save_matches
+    failures = [OSError("disk full")]
+
+    def flaky_save_matches(self, records, filepath):
+        if failures:
+            raise failures.pop()
+        save_matches(self, records, filepath)
+
+    monkeypatch.setattr(APIScraperBot, "save_matches", flaky_save_matches)
+    checkpointer = Checkpointer(bot, filepath, SeenIndex())
+    for match_id in range(Checkpointer.CHECKPOINT_EVERY + 1):
+        checkpointer.add(record(str(match_id)))
+    checkpointer.close(True)
+
+    warning = ("Couldn't save a checkpoint: disk full", "warning")
+    assert warning in bot.output["messages"]
+    logged = MatchLog(MatchLog.path_for(filepath)).read()
+    assert len(list(logged)) == Checkpointer.CHECKPOINT_EVERY + 1
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from data import HTTPScraperBot, MatchLog, read_resume_marker
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "smitesource")
+HISTORY = ["1006", "1005", "1004", "1003", "1002", "1001"]
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    # Serves tests/fixtures/smitesource over keep-alive, fails the paths in
+    # server.failing and takes server.delay seconds for every match page
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.started.append(time.monotonic())
+            server.in_flight += 1
+            server.most_in_flight = max(server.most_in_flight, server.in_flight)
+        try:
+            if self.path.startswith("/match/"):
+                time.sleep(server.delay)
+            if self.path in server.failing:
+                self.send_error(500)
+                return
+            super().do_GET()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(FixtureHandler, directory=FIXTURES)
+    )
+    server.lock = threading.Lock()
+    server.requests = []
+    server.started = []
+    server.failing = set()
+    server.delay = 0.0
+    server.in_flight = 0
+    server.most_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def scrape(server, filepath, **options):
+    output = {}
+    url = f"http://127.0.0.1:{server.server_address[1]}/player/Tester-1/"
+    HTTPScraperBot(**options).get_player_data(url, filepath, output)
+    return output
+
+
+def logged_ids(filepath):
+    return [record.match_id for record in MatchLog(MatchLog.path_for(filepath)).read()]
+
+
+def test_scrapes_the_whole_history(server, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    output = scrape(server, filepath)
+
+    assert output["messages"][-2][0] == "Done scraping!"
+    assert output["gods_completed"] == output["god_count"] == 6
+    assert logged_ids(filepath) == HISTORY
+    assert read_resume_marker(filepath) is None
+
+    data = output["data"]
+    assert (data["Agni"].total_wins, data["Agni"].total_losses) == (2, 1)
+    assert tuple(data["Agni"].matchups["Athena"]) == (1, 0)
+    assert tuple(data["Agni"].matchups["Ares"]) == (0, 1)
+    assert tuple(data["Ares"].matchups["Apollo"]) == (0, 1)
+    assert tuple(data["Athena"].matchups["Ares"]) == (1, 0)
+    # Allies don't count
+    assert tuple(data["Agni"].matchups["Cupid"]) == (0, 0)
+
+
+def test_update_stops_at_the_first_match_it_has(server, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    scrape(server, filepath)
+    server.requests.clear()
+
+    output = scrape(server, filepath)
+    assert ("Found old 1006", "normal") in output["messages"]
+    assert output["gods_completed"] == 0
+    # The first page's matches are fetched together, nothing after it
+    assert sorted(server.requests) == [
+        "/match/1004.html",
+        "/match/1005.html",
+        "/match/1006.html",
+        "/player/Tester-1/",
+    ]
+    assert logged_ids(filepath) == HISTORY
+
+
+def test_failed_match_stops_the_scrape_and_the_next_one_resumes(server, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    server.failing.add("/match/1004.html")
+
+    output = scrape(server, filepath)
+    assert server.requests.count("/match/1004.html") == HTTPScraperBot.MATCH_ATTEMPTS
+    assert output["gods_completed"] == output["god_count"] == 2
+    assert logged_ids(filepath) == HISTORY[:2]
+    assert read_resume_marker(filepath)["match_id"] == "1005"
+
+    server.failing.clear()
+    output = scrape(server, filepath)
+    assert output["gods_completed"] == 4
+    assert logged_ids(filepath) == HISTORY
+    assert read_resume_marker(filepath) is None
+    data = output["data"]
+    assert (data["Agni"].total_wins, data["Agni"].total_losses) == (2, 1)
+
+
+def test_page_without_matches_is_an_empty_history(tmp_path):
+    bot = HTTPScraperBot()
+    matches, next_url = bot.read_history_page("<html><body></body></html>", "x")
+    assert matches == [] and next_url is None
+
+
+def test_match_pages_are_fetched_concurrently_up_to_the_limit(server, tmp_path):
+    server.delay = 0.2
+    output = scrape(server, str(tmp_path / "Tester.pkl"), concurrency=2)
+    assert output["gods_completed"] == 6
+    assert server.most_in_flight == 2
+    # Applied in history order all the same
+    assert logged_ids(str(tmp_path / "Tester.pkl")) == HISTORY
+
+
+def test_every_request_goes_through_one_rate_limiter(server, tmp_path):
+    scrape(server, str(tmp_path / "Tester.pkl"), requests_per_second=10)
+    assert len(server.started) == 8
+    # History pages included, so there's no burst where a page starts
+    gaps = [
+        later - earlier for earlier, later in zip(server.started, server.started[1:])
+    ]
+    assert min(gaps) > 0.08
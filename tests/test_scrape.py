@@ -0,0 +1,99 @@
+import pytest
+from fake_site import PAGE_SIZE, Crash, FakeSite, make_history
+
+from data import MatchLog, load_data, read_resume_marker
+
+
+def logged(filepath):
+    return list(MatchLog(MatchLog.path_for(filepath)).read())
+
+
+def ids(records):
+    return [record.match_id for record in records]
+
+
+def assert_loaded(filepath, history):
+    # Every match of history counted exactly once
+    data, seen = load_data(filepath)
+    assert set(seen) == set(ids(history))
+    assert sum(god.total_wins + god.total_losses for god in data.values()) == len(
+        history
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_crash_resume_then_update(monkeypatch, tmp_path, workers):
+    filepath = str(tmp_path / "Tester.pkl")
+    first = make_history("a", 95)
+    site = FakeSite(list(first))
+    site.install(monkeypatch)
+
+    site.crash_at = "a37"
+    with pytest.raises(Crash):
+        site.scrape(filepath, workers)
+    # What was saved is the newest part of the history, with the marker at
+    # its oldest match
+    saved = ids(logged(filepath))
+    assert saved and saved == ids(first[: len(saved)])
+    assert len(saved) <= 37
+    assert read_resume_marker(filepath) == {"match_id": saved[-1], "timed": False}
+
+    # Newer matches came in since, and the resumed scrape skips the saved
+    # ones instead of stopping at them
+    site.crash_at = None
+    site.history = make_history("n", 5) + first
+    output = site.scrape(filepath, workers)
+    assert ("Picking up where the last scrape stopped", "normal") in output["messages"]
+    assert output["messages"][-2][0] == "Done scraping!"
+    assert read_resume_marker(filepath) is None
+    assert_loaded(filepath, site.history)
+
+    site.history = make_history("m", 3) + site.history
+    output = site.scrape(filepath, workers)
+    assert ("Found old n0", "normal") in output["messages"]
+    assert output["gods_completed"] == 3
+    assert_loaded(filepath, site.history)
+
+    # Only matches found by an update are timestamped
+    for record in logged(filepath):
+        assert bool(record.played_at) == (record.match_id[0] in "nm")
+
+
+def test_parallel_scrape_applies_pages_in_history_order(monkeypatch, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    site = FakeSite(make_history("a", 4 * PAGE_SIZE + 5))
+    # The first pages finish last
+    site.page_delays = {0: 0.02, 1: 0.01}
+    site.install(monkeypatch)
+
+    output = site.scrape(filepath, workers=3)
+    assert ids(logged(filepath)) == ids(site.history)
+    assert output["gods_completed"] == output["god_count"] == len(site.history)
+    assert output["messages"][-2][0] == "Done scraping!"
+
+
+def test_parallel_update_only_visits_the_pages_it_needs(monkeypatch, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    site = FakeSite(make_history("a", 5 * PAGE_SIZE))
+    site.install(monkeypatch)
+    site.scrape(filepath, workers=3)
+
+    site.history = make_history("m", 3) + site.history
+    site.pages_visited.clear()
+    output = site.scrape(filepath, workers=3)
+    assert output["gods_completed"] == 3
+    # No counting pass over the history, at most a page per worker
+    assert site.pages_visited <= {0, 1, 2}
+    assert_loaded(filepath, site.history)
+
+
+def test_failed_page_stops_the_parallel_scrape_before_it(monkeypatch, tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    site = FakeSite(make_history("a", 5 * PAGE_SIZE))
+    site.install(monkeypatch)
+
+    site.crash_at = f"a{2 * PAGE_SIZE + 4}"
+    with pytest.raises(Crash):
+        site.scrape(filepath, workers=3)
+    assert ids(logged(filepath)) == ids(site.history[: 2 * PAGE_SIZE])
+    assert read_resume_marker(filepath)["match_id"] == f"a{2 * PAGE_SIZE - 1}"
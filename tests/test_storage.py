@@ -0,0 +1,107 @@
+import os
+
+from data import (
+    APIScraperBot,
+    MatchLog,
+    MatchRecord,
+    SeenIndex,
+    apply_match,
+    create_data,
+    load_data,
+    read_snapshot,
+    snapshot_backup_path,
+    write_snapshot,
+)
+
+GODS = ["Agni", "Ares", "Athena"]
+
+
+def history(count):
+    return [
+        MatchRecord(str(i), GODS[i % 3], i % 2 == 0, [GODS[(i + 1) % 3]])
+        for i in range(count)
+    ]
+
+
+def total(data):
+    return sum(god.total_wins + god.total_losses for god in data.values())
+
+
+def save(filepath, records):
+    # A snapshot of records that ends where the log does
+    data = create_data(GODS)
+    for record in records:
+        apply_match(data, record)
+    log = MatchLog(MatchLog.path_for(filepath))
+    write_snapshot(data, SeenIndex(r.match_id for r in records), log.size(), filepath)
+
+
+def test_append_cuts_off_a_partial_last_line(tmp_path):
+    log = MatchLog(str(tmp_path / "Tester.log"))
+    log.append(history(2))
+    with open(log.filepath, "a") as log_file:
+        log_file.write("99\tAgni\tW\tAr")
+    log.append(history(3)[2:])
+    assert [record.match_id for record in log.read()] == ["0", "1", "2"]
+
+
+def test_read_leaves_a_partial_line_for_next_time(tmp_path):
+    log = MatchLog(str(tmp_path / "Tester.log"))
+    log.append(history(1))
+    line = history(2)[1].to_line()
+    with open(log.filepath, "a") as log_file:
+        log_file.write(line[:5])
+    assert len(list(log.read())) == 1
+    position = log.position
+
+    with open(log.filepath, "a") as log_file:
+        log_file.write(line[5:] + "\n")
+    assert [record.match_id for record in log.read(position)] == ["1"]
+
+
+def test_load_replays_the_log_past_the_snapshot(tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    log = MatchLog(MatchLog.path_for(filepath))
+    log.append(history(4))
+    save(filepath, history(4))
+    log.append(history(7)[4:])
+
+    data, seen = load_data(filepath)
+    assert total(data) == 7
+    assert len(seen) == 7
+
+
+def test_damaged_snapshot_falls_back_to_the_backup(tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    log = MatchLog(MatchLog.path_for(filepath))
+    log.append(history(4))
+    save(filepath, history(4))
+    log.append(history(9)[4:])
+    save(filepath, history(9))
+    assert os.path.exists(snapshot_backup_path(filepath))
+
+    # Cut off like a crash while it was written
+    with open(filepath, "r+b") as data_file:
+        data_file.truncate(10)
+    data, _, _ = read_snapshot(filepath)
+    assert total(data) == 4
+
+    # Replaying the log from the backup catches it up
+    data, seen = load_data(filepath)
+    assert total(data) == 9
+    assert len(seen) == 9
+
+
+def test_unreadable_snapshots_are_rebuilt_from_the_log(tmp_path):
+    filepath = str(tmp_path / "Tester.pkl")
+    MatchLog(MatchLog.path_for(filepath)).append(history(5))
+    for path in (filepath, snapshot_backup_path(filepath)):
+        with open(path, "wb") as data_file:
+            data_file.write(b"\x80")
+
+    bot = APIScraperBot("")
+    bot.output = {"messages": []}
+    data, seen = bot.load_previous_data(filepath)
+    assert total(data) == 5
+    assert len(seen) == 5
+    assert os.path.exists(filepath + ".corrupt")